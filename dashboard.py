@@ -1,12 +1,10 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+from collections import deque
 from datetime import datetime
 import time
-import sys
-import os
 
 # Налаштування сторінки
 st.set_page_config(
@@ -15,18 +13,28 @@ st.set_page_config(
     layout="wide"
 )
 
-# Додаємо src до шляху
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
-
-# Імпорт модулів БЕЗ кешування
+# Імпорт модулів (TensorFlow завантажується лише при навчанні або для старих h5-моделей)
 try:
-    from data_loader import IoTDataLoader
-    from model_training import IoTAnomalyDetector
-    from simulator import IoTTrafficSimulator
+    from src.data_loader import IoTDataLoader
+    from src.model_training import IoTAnomalyDetector
+    from src.detector_cache import DetectorCache
+    from src.cross_validation import load_report
+    from src.traffic_stream import TrafficStream
+    from src.live_buffer import LiveTrafficBuffer
 except ImportError as e:
     st.error(f"❌ Помилка імпорту: {e}")
     st.stop()
 
+BUNDLE_PATH = 'models/anomaly_detector.bundle'
+# Скільки останніх потоків Live Demo тримає в пам'яті (лічильники рахують усю сесію)
+LIVE_CAPACITY = 1000
+
+
+@st.cache_resource
+def shared_detectors():
+    # Один кеш на процес: усі вкладки ділять одну копію моделі; нова версія підміняється у фоні
+    return DetectorCache(BUNDLE_PATH)
+
 # Мінімальний CSS
 st.markdown("""
 <style>
@@ -37,12 +45,10 @@ st.markdown("""
 # Session State
 if 'model_loaded' not in st.session_state:
     st.session_state.model_loaded = False
-if 'detector' not in st.session_state:
-    st.session_state.detector = None
-if 'traffic_data' not in st.session_state:
-    st.session_state.traffic_data = pd.DataFrame()
+if 'traffic' not in st.session_state:
+    st.session_state.traffic = LiveTrafficBuffer(capacity=LIVE_CAPACITY)
 if 'alerts' not in st.session_state:
-    st.session_state.alerts = []
+    st.session_state.alerts = deque(maxlen=100)
 if 'simulation_running' not in st.session_state:
     st.session_state.simulation_running = False
 
@@ -70,9 +76,7 @@ if mode == "🎬 Live Demo":
         if st.button("📥 Завантажити модель", type="primary"):
             try:
                 with st.spinner("Завантаження..."):
-                    detector = IoTAnomalyDetector(input_dim=8)
-                    detector.load_model()
-                    st.session_state.detector = detector
+                    shared_detectors().get()
                     st.session_state.model_loaded = True
                     st.success("✅ Готово!")
                     time.sleep(1)
@@ -93,23 +97,21 @@ if mode == "🎬 Live Demo":
                 st.rerun()
         with col3:
             if st.button("🔄 Очистити"):
-                st.session_state.traffic_data = pd.DataFrame()
-                st.session_state.alerts = []
+                st.session_state.traffic.clear()
+                st.session_state.alerts.clear()
                 st.rerun()
         
         # Метрики
-        total_packets = len(st.session_state.traffic_data)
-        anomalies = len([a for a in st.session_state.alerts if a.get('type') != 'Benign'])
-        
+        traffic = st.session_state.traffic
         col_m1, col_m2, col_m3 = st.columns(3)
-        col_m1.metric("📦 Пакетів", total_packets)
-        col_m2.metric("🚨 Атак", anomalies)
-        col_m3.metric("⚡ Загроза", f"{(anomalies/total_packets*100) if total_packets > 0 else 0:.1f}%")
+        col_m1.metric("📦 Пакетів", traffic.total)
+        col_m2.metric("🚨 Атак", traffic.attacks_detected())
+        col_m3.metric("⚡ Загроза", f"{traffic.threat_rate()*100:.1f}%")
         
         # Алерти
         if st.session_state.alerts:
             st.subheader("🚨 Алерти")
-            for alert in reversed(st.session_state.alerts[-3:]):
+            for alert in reversed(list(st.session_state.alerts)[-3:]):
                 if alert.get('type') != 'Benign':
                     conf = alert.get('confidence', 0) * 100 if alert.get('confidence', 0) <= 1 else alert.get('confidence', 0)
                     st.error(f"⚠️ **{alert.get('type')}** на {alert.get('device')} | Впевненість: {conf:.1f}%")
@@ -127,59 +129,47 @@ if mode == "🎬 Live Demo":
         
         # Симуляція
         if st.session_state.simulation_running:
-            simulator = IoTTrafficSimulator()
+            # Потік з симульованим годинником: 1 пакет кожні refresh_rate секунд
+            stream = TrafficStream(batch_size=1, flows_per_second=1 / refresh_rate, attack_prob=attack_prob)
+            detector = shared_detectors().get()
             
             for iteration in range(20):
                 if not st.session_state.simulation_running:
                     break
                 
-                device = np.random.choice(simulator.device_types)
-                
-                if np.random.random() < attack_prob:
-                    attack = np.random.choice(['ddos', 'port_scan', 'mirai'])
-                    if attack == 'ddos':
-                        traffic = simulator.generate_ddos_attack(device, 1)
-                    elif attack == 'port_scan':
-                        traffic = simulator.generate_port_scan(device, 1)
-                    else:
-                        traffic = simulator.generate_mirai_botnet(device, 1)
-                else:
-                    traffic = simulator.generate_normal_traffic(device, 1)
-                
-                new_data = pd.DataFrame(traffic)
-                st.session_state.traffic_data = pd.concat([st.session_state.traffic_data, new_data], ignore_index=True)
+                new_data = next(stream)
+                device = new_data['device'].iloc[0]
                 
                 # Детекція
                 X_new = new_data[['dur', 'spkts', 'dpkts', 'sbytes', 'dbytes', 'rate', 'sttl', 'dttl']]
-                anomalies_detected, scores, _ = st.session_state.detector.detect_anomalies(X_new)
+                anomalies_detected, scores, _ = detector.detect_anomalies(X_new)
+                traffic.append(new_data, anomalies_detected, scores)
                 
                 if anomalies_detected[0]:
                     st.session_state.alerts.append({
                         'timestamp': datetime.now().strftime("%H:%M:%S"),
                         'device': device,
-                        'type': traffic[0]['label'],
+                        'type': new_data['label'].iloc[0],
                         'confidence': float(scores[0])
                     })
                 
                 # Оновлення графіків
-                if len(st.session_state.traffic_data) > 0:
-                    label_dist = st.session_state.traffic_data['label'].value_counts()
-                    fig1 = px.bar(x=label_dist.index, y=label_dist.values, 
-                                 color=label_dist.index,
+                if traffic.total > 0:
+                    label_dist = traffic.label_distribution()
+                    fig1 = px.bar(x=list(label_dist), y=list(label_dist.values()), 
+                                 color=list(label_dist),
                                  color_discrete_map={'Benign': '#4caf50', 'DDoS': '#f44336', 
                                                     'PortScan': '#ff9800', 'Mirai': '#9c27b0'})
                     fig1.update_layout(showlegend=False, height=250)
                     chart1.plotly_chart(fig1, use_container_width=True)
                     
-                    recent = st.session_state.traffic_data.tail(30)
+                    recent = traffic.tail(30, ['label', 'rate'])
                     fig2 = px.line(recent, y='rate', color='label')
                     fig2.update_layout(height=250)
                     chart2.plotly_chart(fig2, use_container_width=True)
                     
                     cols = ['timestamp', 'device', 'label', 'rate', 'spkts']
-                    table.dataframe(st.session_state.traffic_data[cols].tail(10), use_container_width=True)
-                
-                time.sleep(refresh_rate)
+                    table.dataframe(traffic.tail(10, cols), use_container_width=True)
             
             st.session_state.simulation_running = False
             st.rerun()
@@ -218,8 +208,9 @@ elif mode == "📊 Аналіз датасету":
                 detector = IoTAnomalyDetector(input_dim=X.shape[1])
                 history, _ = detector.train(X, y, epochs=20, batch_size=128)
                 detector.save_model()
+                detector.save_bundle(BUNDLE_PATH, feature_order=features)
                 
-                st.session_state.detector = detector
+                # Спільний кеш побачить новий бандл за mtime і у фоні підмінить модель для всіх сесій
                 st.session_state.model_loaded = True
                 
                 st.success("🎉 Готово!")
@@ -229,31 +220,45 @@ elif mode == "📊 Аналіз датасету":
 elif mode == "📈 Статистика":
     st.header("📈 Статистика моделі")
     
-    if not st.session_state.model_loaded:
-        st.warning("⚠️ Модель не завантажена")
+    # Метрики з останньої крос-валідації (python -m src.cross_validation)
+    report = load_report()
+    if report is None:
+        st.warning("⚠️ Звіт крос-валідації відсутній")
+        st.info("💡 Запустіть: python -m src.cross_validation")
     else:
-        col1, col2, col3, col4 = st.columns(4)
-        col1.metric("🎯 Accuracy", "94.7%")
-        col2.metric("📈 Precision", "95.8%")
-        col3.metric("📉 Recall", "93.2%")
-        col4.metric("⚖️ F1-Score", "94.5%")
+        summary = report['summary']
+        
+        def fmt(stats, percent=True):
+            if stats is None:
+                return "—", None
+            if percent:
+                return f"{stats['mean']*100:.1f}%", f"±{(stats['ci_high'] - stats['ci_low'])*50:.1f} п.п."
+            return f"{stats['mean']:,.0f}", f"±{(stats['ci_high'] - stats['ci_low'])/2:,.0f}"
+        
+        col1, col2, col3, col4, col5 = st.columns(5)
+        col1.metric("🎯 Accuracy", *fmt(summary['accuracy']), delta_color="off")
+        col2.metric("📈 Precision", *fmt(summary['precision']), delta_color="off")
+        col3.metric("📉 Recall", *fmt(summary['recall']), delta_color="off")
+        col4.metric("⚖️ F1-Score", *fmt(summary['f1']), delta_color="off")
+        col5.metric("📐 ROC-AUC", *fmt(summary['roc_auc']), delta_color="off")
+        
+        col1, col2 = st.columns(2)
+        col1.metric("⏱️ Навчання (с/фолд)", f"{summary['train_seconds']['mean']:.1f}")
+        col2.metric("⚡ Потоків/с", *fmt(summary['flows_per_second'], percent=False), delta_color="off")
+        
+        st.caption(f"{report['model_type']}, {report['n_splits']} фолдів, {report['n_samples']:,} потоків, "
+                   f"довірчий інтервал {report['confidence']*100:.0f}%, {report['created']}")
         
-        st.code("""
-TensorFlow Model:
-- Input: 8 features
-- Dense(128) + Dropout(0.3)
-- Dense(64) + Dropout(0.3)  
-- Dense(32) + Dropout(0.2)
-- Dense(16)
-- Output(1) Sigmoid
-        """)
+        if 'detection_rate' in report:
+            detection_data = {
+                'Трафік': list(report['detection_rate']),
+                'Позначено як атаку': [f"{s['mean']*100:.1f}%" for s in report['detection_rate'].values()],
+                'Інтервал': [f"{s['ci_low']*100:.1f}–{s['ci_high']*100:.1f}%" for s in report['detection_rate'].values()]
+            }
+            st.dataframe(pd.DataFrame(detection_data), use_container_width=True)
         
-        detection_data = {
-            'Атака': ['DDoS', 'Port Scan', 'Mirai'],
-            'Точність': ['98.5%', '94.3%', '96.7%'],
-            'Час': ['<2s', '<1s', '<3s']
-        }
-        st.dataframe(pd.DataFrame(detection_data), use_container_width=True)
+        folds = pd.DataFrame(report['folds']).drop(columns=['detection_rate'], errors='ignore')
+        st.dataframe(folds, use_container_width=True)
 
 # Футер
 st.markdown("---")
\ No newline at end of file
@@ -2,10 +2,10 @@
 Швидкий старт з детальним відображенням прогресу
 """
 
-import numpy as np
-import pandas as pd
 from src.model_training import IoTAnomalyDetector
 from src.simulator import IoTTrafficSimulator
+from src.dataset_writer import DatasetWriter
+from src.data_loader import IoTDataLoader
 import os
 from datetime import datetime
 from tqdm import tqdm
@@ -38,43 +38,35 @@ print_step(f"✅ Симулятор готовий. Пристроїв: {len(sim
 # Крок 3: Генерація даних
 print_header("📊 ГЕНЕРАЦІЯ ДАТАСЕТУ")
 
-all_traffic = []
 device_stats = {}
-
-# Progress bar для пристроїв
-for device in tqdm(simulator.device_types, desc="🔄 Пристрої", ncols=80, file=sys.stdout):
-    device_traffic = []
-    
-    # Нормальний трафік
-    for _ in tqdm(range(1000), desc=f"  ✓ {device[:15]:15s} (Normal)", 
-                  leave=False, ncols=80, file=sys.stdout):
-        traffic = simulator.generate_normal_traffic(device, 1)
-        device_traffic.extend(traffic)
-    
-    # DDoS атаки
-    for _ in tqdm(range(200), desc=f"  ⚠️  {device[:15]:15s} (DDoS)  ", 
-                  leave=False, ncols=80, file=sys.stdout):
-        traffic = simulator.generate_ddos_attack(device, 1)
-        device_traffic.extend(traffic)
-    
-    # Port Scan
-    for _ in tqdm(range(150), desc=f"  🔍 {device[:15]:15s} (Scan)  ", 
-                  leave=False, ncols=80, file=sys.stdout):
-        traffic = simulator.generate_port_scan(device, 1)
-        device_traffic.extend(traffic)
-    
-    # Mirai
-    for _ in tqdm(range(100), desc=f"  🦠 {device[:15]:15s} (Mirai) ", 
-                  leave=False, ncols=80, file=sys.stdout):
-        traffic = simulator.generate_mirai_botnet(device, 1)
-        device_traffic.extend(traffic)
-    
-    all_traffic.extend(device_traffic)
-    device_stats[device] = len(device_traffic)
-
-# Створення DataFrame
+dataset_path = 'data/synthetic_iot_dataset.csv'
+
+# Кількість пакетів кожного типу для одного пристрою
+traffic_plan = [
+    ('normal', 1000),
+    ('ddos', 200),
+    ('port_scan', 150),
+    ('mirai', 100),
+]
+
+# Батчі одразу дописуються у CSV, без накопичення всього трафіку в пам'яті
+with DatasetWriter(dataset_path) as writer:
+    # Progress bar для пристроїв
+    for device in tqdm(simulator.device_types, desc="🔄 Пристрої", ncols=80, file=sys.stdout):
+        device_stats[device] = 0
+        
+        # Кожен тип трафіку генерується одним векторизованим батчем
+        for traffic_type, n_packets in tqdm(traffic_plan, desc=f"  ✓ {device[:15]:15s}",
+                                            leave=False, ncols=80, file=sys.stdout):
+            batch = simulator.generate_batch(device, traffic_type, n_packets)
+            writer.write(batch)
+            device_stats[device] += len(batch)
+
+print_step(f"✅ Збережено: {dataset_path}")
+
+# Завантаження DataFrame з диску
 print_step("📦 Створення DataFrame...")
-df = pd.DataFrame(all_traffic)
+df = IoTDataLoader(dataset_path).load_data()
 
 # Статистика
 print_header("📊 СТАТИСТИКА ДАТАСЕТУ")
@@ -97,11 +89,6 @@ for device, count in device_stats.items():
     pct = (count / len(df)) * 100
     print(f"  {device:<17} {count:>6,}  ({pct:>5.1f}%)")
 
-# Збереження
-print_step("💾 Збереження датасету...")
-df.to_csv('data/synthetic_iot_dataset.csv', index=False)
-print_step("✅ Збережено: data/synthetic_iot_dataset.csv")
-
 # Крок 4: Підготовка даних
 print_header("🔧 ПІДГОТОВКА ДО НАВЧАННЯ")
 
@@ -148,10 +135,12 @@ print_header("💾 ЗБЕРЕЖЕННЯ МОДЕЛІ")
 
 print_step("Збереження моделі та preprocessor...")
 detector.save_model()
+detector.save_bundle(feature_order=feature_columns)
 print_step("✅ Модель збережено:")
 print_step("   • models/anomaly_detector.h5")
 print_step("   • models/preprocessor.pkl")
 print_step("   • models/model_metrics.json")
+print_step("   • models/anomaly_detector.bundle")
 
 # Результати
 print_header("✅ СИСТЕМА ГОТОВА!")
@@ -0,0 +1,170 @@
+import joblib
+import numpy as np
+
+
+class DetectorBackend:
+    """Спільний інтерфейс моделі детектора.
+
+    Backend працює з уже масштабованими ознаками: fit навчає модель, score повертає
+    одновимірний масив anomaly scores (більше - підозріліше), threshold - поріг за
+    замовчуванням для detect_anomalies.
+    """
+
+    name = None
+    requires_labels = True
+    # Keras-модель: процесам-воркерам потрібно налаштувати потоки TensorFlow
+    uses_tensorflow = True
+
+    def __init__(self, model, threshold=0.5):
+        self.model = model
+        self.threshold = threshold
+
+    def fit(self, X_train, y_train, X_val, y_val, epochs=50, batch_size=128, verbose=1):
+        raise NotImplementedError
+
+    def score(self, X):
+        raise NotImplementedError
+
+    def save(self, path):
+        self.model.save(path)
+
+    @classmethod
+    def load(cls, path, threshold=0.5):
+        from tensorflow import keras
+        return cls(keras.models.load_model(path), threshold)
+
+
+class ClassifierBackend(DetectorBackend):
+    """MLP-класифікатор з build_classifier_model; score - ймовірність атаки"""
+
+    name = 'classifier'
+
+    @classmethod
+    def create(cls, detector, **params):
+        return cls(detector.build_classifier_model(**params))
+
+    @staticmethod
+    def compile(model, learning_rate=0.001):
+        from tensorflow import keras
+        from tensorflow.keras import metrics as keras_metrics
+        # ВИПРАВЛЕНО: використовуємо класи метрик замість рядків
+        model.compile(
+            optimizer=keras.optimizers.Adam(learning_rate=learning_rate),
+            loss='binary_crossentropy',
+            metrics=[
+                'accuracy',
+                keras_metrics.Precision(name='precision'),
+                keras_metrics.Recall(name='recall')
+            ]
+        )
+        return model
+
+    def fit(self, X_train, y_train, X_val, y_val, epochs=50, batch_size=128, verbose=1):
+        return self.model.fit(
+            X_train, y_train,
+            epochs=epochs,
+            batch_size=batch_size,
+            validation_data=(X_val, y_val),
+            verbose=verbose
+        )
+
+    def score(self, X):
+        return self.model.predict(X, verbose=0).flatten()
+
+
+class AutoencoderBackend(DetectorBackend):
+    """Dense-автоенкодер без учителя: score - середня квадратична помилка реконструкції.
+
+    Навчається на нормальному трафіку (якщо лейбли є) або на всьому потоці; поріг -
+    percentile помилок реконструкції на навчальних даних.
+    """
+
+    name = 'autoencoder'
+    requires_labels = False
+
+    def __init__(self, model, threshold=None, percentile=99.0):
+        super().__init__(model, threshold)
+        self.percentile = percentile
+
+    @classmethod
+    def create(cls, detector, encoding_dim=4):
+        from tensorflow import keras
+        from tensorflow.keras import layers
+        model = keras.Sequential([
+            layers.Input(shape=(detector.input_dim,)),
+            layers.Dense(32, activation='relu'),
+            layers.Dense(16, activation='relu'),
+            layers.Dense(encoding_dim, activation='relu'),
+            layers.Dense(16, activation='relu'),
+            layers.Dense(32, activation='relu'),
+            layers.Dense(detector.input_dim, activation='linear')
+        ])
+        print("✅ Автоенкодер створено")
+        return cls(cls.compile(model))
+
+    @staticmethod
+    def compile(model):
+        from tensorflow import keras
+        model.compile(optimizer='adam', loss=keras.losses.MeanSquaredError())
+        return model
+
+    def fit(self, X_train, y_train, X_val, y_val, epochs=50, batch_size=128, verbose=1):
+        # Вчимо відтворювати лише нормальний трафік, атаки дають більшу помилку
+        if y_train is not None:
+            X_train = X_train[np.asarray(y_train).ravel() == 0]
+        if y_val is not None:
+            X_val = X_val[np.asarray(y_val).ravel() == 0]
+        history = self.model.fit(
+            X_train, X_train,
+            epochs=epochs,
+            batch_size=batch_size,
+            validation_data=(X_val, X_val),
+            verbose=verbose
+        )
+        self.threshold = float(np.percentile(self.score(X_train), self.percentile))
+        return history
+
+    def score(self, X):
+        # Один прохід моделі по всьому батчу + векторизована помилка по рядках
+        X = np.asarray(X, dtype=np.float32)
+        reconstruction = self.model.predict(X, batch_size=4096, verbose=0)
+        return np.mean(np.square(X - reconstruction), axis=1)
+
+
+class TreeEnsembleBackend(DetectorBackend):
+    """Градієнтний бустинг дерев (sklearn); score - ймовірність атаки. Не потребує TensorFlow"""
+
+    name = 'tree'
+    uses_tensorflow = False
+
+    @classmethod
+    def create(cls, detector, max_iter=200, max_leaf_nodes=31):
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        model = HistGradientBoostingClassifier(max_iter=max_iter, max_leaf_nodes=max_leaf_nodes,
+                                               early_stopping=True, random_state=42)
+        print("✅ Ансамбль дерев створено")
+        return cls(model)
+
+    def fit(self, X_train, y_train, X_val, y_val, epochs=50, batch_size=128, verbose=1):
+        # epochs і batch_size не використовуються: кількість дерев задає max_iter
+        self.model.fit(X_train, np.asarray(y_train).ravel())
+        return None
+
+    def score(self, X):
+        return self.model.predict_proba(X)[:, 1]
+
+    def save(self, path):
+        joblib.dump(self.model, path)
+
+    @classmethod
+    def load(cls, path, threshold=0.5):
+        return cls(joblib.load(path), threshold)
+
+
+BACKENDS = {backend.name: backend for backend in (ClassifierBackend, AutoencoderBackend, TreeEnsembleBackend)}
+
+
+def get_backend(model_type):
+    if model_type not in BACKENDS:
+        raise ValueError(f"Невідомий model_type '{model_type}', доступні: {', '.join(BACKENDS)}")
+    return BACKENDS[model_type]
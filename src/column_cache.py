@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import numpy as np
+import pandas as pd
+
+CACHE_VERSION = 2
+# Розмір блоків, що хешуються з початку, середини і кінця файлу
+SAMPLE_BYTES = 1 << 20
+# Рядкова колонка з більшою кількістю унікальних значень зберігається як рядки, а не категорія
+MAX_CATEGORIES = 4096
+# Рядки вигляду '2024-01-31 12:00...' / ISO 8601 перетворюються на datetime64
+_DATETIME_RE = re.compile(r'^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}')
+
+
+def source_fingerprint(path, variant=''):
+    """Ключ кешу: шлях, розмір, mtime і хеш вмісту (3 блоки по 1 МБ, щоб не читати весь файл)"""
+    st = os.stat(path)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{CACHE_VERSION}|{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{variant}".encode())
+    with open(path, 'rb') as f:
+        for offset in sorted({0, max(0, st.st_size // 2 - SAMPLE_BYTES // 2), max(0, st.st_size - SAMPLE_BYTES)}):
+            f.seek(offset)
+            h.update(f.read(SAMPLE_BYTES))
+    return h.hexdigest()
+
+
+def _save_strings(prefix, values):
+    # Рядки як у Arrow: зсуви (n + 1) і суцільний буфер UTF-8 байтів, пропуски - окрема маска
+    values = pd.Series(values, dtype=object)
+    missing = values.isna().to_numpy()
+    encoded = [b'' if m else str(v).encode('utf-8') for v, m in zip(values, missing)]
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    if offsets[-1] < 2 ** 31:
+        offsets = offsets.astype(np.int32)
+    np.save(prefix + '.offsets.npy', offsets)
+    np.save(prefix + '.bytes.npy', np.frombuffer(b''.join(encoded), dtype=np.uint8))
+    if missing.any():
+        np.save(prefix + '.missing.npy', missing)
+    return bool(missing.any())
+
+
+def _load_strings(prefix, has_missing=False):
+    """Рядки з _save_strings: з pyarrow - Arrow-масив поверх mmap без копіювання, інакше object"""
+    offsets = np.load(prefix + '.offsets.npy', mmap_mode='r')
+    data = np.load(prefix + '.bytes.npy', mmap_mode='r')
+    missing = np.load(prefix + '.missing.npy') if has_missing else None
+    n = len(offsets) - 1
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raw = data.tobytes()
+        values = np.empty(n, dtype=object)
+        values[:] = [raw[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(n)]
+        if missing is not None:
+            values[missing] = None
+        return values
+    string_type = pa.string() if offsets.dtype == np.int32 else pa.large_string()
+    validity = None if missing is None else pa.py_buffer(np.packbits(~missing, bitorder='little'))
+    array = pa.Array.from_buffers(string_type, n, [validity, pa.py_buffer(offsets), pa.py_buffer(data)])
+    return pd.arrays.ArrowStringArray(array)
+
+
+def _parse_datetimes(series):
+    # Лише якщо вибірка значень схожа на дату-час; інакше колонка лишається рядковою
+    sample = series.dropna().head(100).astype(str)
+    if sample.empty or not sample.map(lambda v: bool(_DATETIME_RE.match(v))).all():
+        return None
+    try:
+        return pd.to_datetime(series, format='ISO8601')
+    except (ValueError, TypeError):
+        return None
+
+
+class ColumnarCache:
+    """Бінарний колонковий кеш датасетів: кожна колонка - окремий .npy, що відкривається через mmap.
+
+    Мало-унікальні рядкові колонки (label, device) зберігаються як категорії: коди .npy і
+    значення категорій у рядкових .npy. Рядки з датою-часом стають datetime64, решта рядків -
+    зсуви + буфер байтів. manifest.json лишається малим, тож повторне завантаження не парсить
+    ні CSV, ні великий JSON і не копіює дані.
+    """
+
+    def __init__(self, cache_dir='data/.cache'):
+        self.cache_dir = cache_dir
+
+    def entry_path(self, source_path, variant=''):
+        return os.path.join(self.cache_dir, source_fingerprint(source_path, variant))
+
+    def load(self, source_path, variant=''):
+        entry = self.entry_path(source_path, variant)
+        manifest_path = os.path.join(entry, 'manifest.json')
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        columns = {}
+        for i, col in enumerate(manifest['columns']):
+            prefix = os.path.join(entry, str(i))
+            if col['kind'] == 'string':
+                columns[col['name']] = _load_strings(prefix, col.get('missing', False))
+                continue
+            values = np.load(prefix + '.npy', mmap_mode='r')
+            if col['kind'] == 'category':
+                categories = pd.Index(_load_strings(prefix + '.categories'), dtype=object)
+                values = pd.Categorical.from_codes(values, dtype=pd.CategoricalDtype(categories), validate=False)
+            elif col['kind'] == 'datetime' and col.get('tz'):
+                values = pd.DatetimeIndex(values).tz_localize('UTC').tz_convert(col['tz'])
+            columns[col['name']] = values
+        return pd.DataFrame(columns, copy=False)
+
+    def store(self, source_path, df, variant=''):
+        entry = self.entry_path(source_path, variant)
+        tmp = entry + '.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        columns = []
+        for i, name in enumerate(df.columns):
+            series = df[name]
+            prefix = os.path.join(tmp, str(i))
+            col = {'name': name}
+            if series.dtype == object or pd.api.types.is_string_dtype(series.dtype):
+                parsed = _parse_datetimes(series)
+                if parsed is not None:
+                    series = parsed
+                elif series.nunique() <= MAX_CATEGORIES:
+                    series = series.astype('category')
+                else:
+                    col['kind'] = 'string'
+                    col['dtype'] = 'str'
+                    col['missing'] = _save_strings(prefix, series)
+                    columns.append(col)
+                    continue
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                col['kind'] = 'category'
+                _save_strings(prefix + '.categories', series.cat.categories)
+                values = series.cat.codes.to_numpy()
+            elif isinstance(series.dtype, pd.DatetimeTZDtype):
+                # mmap-ується наївний UTC, часова зона відновлюється при завантаженні
+                col['kind'] = 'datetime'
+                col['tz'] = str(series.dt.tz)
+                values = series.dt.tz_convert('UTC').dt.tz_localize(None).to_numpy()
+            else:
+                col['kind'] = 'datetime' if pd.api.types.is_datetime64_dtype(series.dtype) else 'array'
+                values = series.to_numpy()
+            col['dtype'] = str(values.dtype)
+            np.save(prefix + '.npy', np.ascontiguousarray(values))
+            columns.append(col)
+        manifest = {
+            'version': CACHE_VERSION,
+            'source': os.path.abspath(source_path),
+            'variant': variant,
+            'rows': len(df),
+            'columns': columns
+        }
+        with open(os.path.join(tmp, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        # Готовий запис з'являється атомарно; напівзаписаний кеш ніколи не читається
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+        return entry
+
+    def load_or_build(self, source_path, build, variant=''):
+        df = self.load(source_path, variant)
+        if df is None:
+            self.store(source_path, build(), variant)
+            df = self.load(source_path, variant)
+        return df
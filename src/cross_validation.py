@@ -0,0 +1,186 @@
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+DEFAULT_REPORT_PATH = 'models/cv_report.json'
+FOLD_METRICS = ['accuracy', 'precision', 'recall', 'f1', 'roc_auc', 'train_seconds', 'flows_per_second']
+# Частки: довірчий інтервал обрізається до [0, 1]
+RATE_METRICS = {'accuracy', 'precision', 'recall', 'f1', 'roc_auc'}
+
+
+def _init_fold_worker(n_threads, uses_tensorflow):
+    # Кожному воркеру своя частка ядер; TensorFlow імпортується лише для Keras-backend'ів
+    if uses_tensorflow:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+    else:
+        # OpenMP-потоки HistGradientBoosting; діє, бо sklearn у воркері ще не імпортовано
+        os.environ['OMP_NUM_THREADS'] = str(n_threads)
+
+
+def _run_fold(task):
+    """Навчає детектор на k-1 фолдах і оцінює на відкладеному (виконується у воркері)"""
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+    from sklearn.preprocessing import StandardScaler
+    from .backends import get_backend
+    from .model_training import IoTAnomalyDetector
+    fold, work_dir, train_idx, test_idx, model_type, epochs, batch_size, model_params = task
+    X = np.load(os.path.join(work_dir, 'X.npy'), mmap_mode='r')
+    y = np.load(os.path.join(work_dir, 'y.npy'), mmap_mode='r')
+    X_train, y_train, X_test, y_test = X[train_idx], y[train_idx], X[test_idx], y[test_idx]
+
+    detector = IoTAnomalyDetector(input_dim=X.shape[1])
+    detector.scaler = StandardScaler().fit(X_train)
+    backend = get_backend(model_type).create(detector, **(model_params or {}))
+    start = time.perf_counter()
+    backend.fit(detector.scaler.transform(X_train), y_train, detector.scaler.transform(X_test), y_test,
+                epochs=epochs, batch_size=batch_size, verbose=0)
+    train_seconds = time.perf_counter() - start
+    detector._use_backend(backend)
+
+    # Прогрів, щоб throughput не включав першу трасировку графа Keras
+    detector.detect_anomalies(X_test[:batch_size])
+    start = time.perf_counter()
+    y_pred, scores, _ = detector.detect_anomalies(X_test)
+    inference_seconds = time.perf_counter() - start
+    result = {
+        'fold': fold,
+        'train_size': int(len(train_idx)),
+        'test_size': int(len(test_idx)),
+        'accuracy': float(accuracy_score(y_test, y_pred)),
+        'precision': float(precision_score(y_test, y_pred, zero_division=0)),
+        'recall': float(recall_score(y_test, y_pred, zero_division=0)),
+        'f1': float(f1_score(y_test, y_pred, zero_division=0)),
+        'roc_auc': float(roc_auc_score(y_test, scores)) if len(np.unique(y_test)) > 1 else None,
+        'train_seconds': train_seconds,
+        'flows_per_second': len(test_idx) / inference_seconds if inference_seconds else None
+    }
+    labels_path = os.path.join(work_dir, 'labels.npy')
+    if os.path.exists(labels_path):
+        # Частка виявлених потоків окремо для кожного класу трафіку
+        labels = np.load(labels_path, allow_pickle=True)[test_idx]
+        result['detection_rate'] = {str(label): float(np.mean(y_pred[labels == label]))
+                                    for label in np.unique(labels)}
+    return result
+
+
+def confidence_interval(values, confidence=0.95, bounds=None):
+    """Середнє, std і довірчий інтервал за t-розподілом Стьюдента (k фолдів - мала вибірка)"""
+    from scipy import stats
+    values = np.asarray([v for v in values if v is not None], dtype=np.float64)
+    if len(values) == 0:
+        return None
+    mean = float(values.mean())
+    std = float(values.std(ddof=1)) if len(values) > 1 else 0.0
+    half = float(stats.t.ppf((1 + confidence) / 2, len(values) - 1) * std / np.sqrt(len(values))) if len(values) > 1 else 0.0
+    low, high = mean - half, mean + half
+    if bounds is not None:
+        low, high = max(low, bounds[0]), min(high, bounds[1])
+    return {'mean': mean, 'std': std, 'ci_low': low, 'ci_high': high}
+
+
+def cross_validate(X, y, labels=None, n_splits=5, model_type='classifier', epochs=20, batch_size=128,
+                   model_params=None, n_workers=None, seed=42, confidence=0.95, report_path=DEFAULT_REPORT_PATH):
+    """Stratified k-fold крос-валідація детектора, фолди навчаються паралельно в процесах.
+
+    labels - необов'язкові вихідні мітки трафіку (Benign/DDoS/...): за ними стратифікуються
+    фолди і рахується частка виявлених потоків кожного класу. Звіт з метриками фолдів і
+    довірчими інтервалами зберігається у report_path (його читає сторінка статистики dashboard).
+    """
+    from sklearn.model_selection import StratifiedKFold
+    from .backends import get_backend
+
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y).ravel().astype(np.int8)
+    strata = y if labels is None else np.asarray(labels).astype(str)
+    splits = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed).split(X, strata))
+
+    work_dir = tempfile.mkdtemp(prefix='iot_cv_')
+    try:
+        # Воркери відкривають дані через mmap замість пересилання копії в кожну задачу
+        np.save(os.path.join(work_dir, 'X.npy'), X)
+        np.save(os.path.join(work_dir, 'y.npy'), y)
+        if labels is not None:
+            np.save(os.path.join(work_dir, 'labels.npy'), strata.astype(object))
+        tasks = [(fold, work_dir, train_idx, test_idx, model_type, epochs, batch_size, model_params)
+                 for fold, (train_idx, test_idx) in enumerate(splits)]
+        n_workers = min(n_workers or os.cpu_count() or 1, n_splits)
+        n_threads = max(1, (os.cpu_count() or 1) // n_workers)
+        print(f"🔁 Крос-валідація: {n_splits} фолдів, {model_type}, {n_workers} воркерів")
+        # spawn: батьківський процес уже міг завантажити TensorFlow, fork з ним небезпечний
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=context,
+                                 initializer=_init_fold_worker,
+                                 initargs=(n_threads, get_backend(model_type).uses_tensorflow)) as pool:
+            folds = []
+            for result in pool.map(_run_fold, tasks):
+                folds.append(result)
+                print(f"   Фолд {result['fold'] + 1}/{n_splits}: F1 {result['f1']:.4f}, "
+                      f"навчання {result['train_seconds']:.1f}с")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    summary = {metric: confidence_interval([f[metric] for f in folds], confidence,
+                                           (0.0, 1.0) if metric in RATE_METRICS else None)
+               for metric in FOLD_METRICS}
+    report = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'model_type': model_type,
+        'model_params': model_params or {},
+        'n_splits': n_splits,
+        'n_samples': int(len(y)),
+        'epochs': epochs,
+        'confidence': confidence,
+        'summary': summary,
+        'folds': folds
+    }
+    if labels is not None:
+        classes = sorted({label for f in folds for label in f['detection_rate']})
+        report['detection_rate'] = {
+            label: confidence_interval([f['detection_rate'].get(label) for f in folds], confidence, (0.0, 1.0))
+            for label in classes
+        }
+    if report_path:
+        os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
+        with open(report_path + '.tmp', 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False, default=list)
+        os.replace(report_path + '.tmp', report_path)
+        print(f"✅ Звіт крос-валідації збережено: {report_path}")
+    return report
+
+
+def load_report(report_path=DEFAULT_REPORT_PATH):
+    if not os.path.exists(report_path):
+        return None
+    with open(report_path) as f:
+        return json.load(f)
+
+
+if __name__ == '__main__':
+    from .data_loader import IoTDataLoader
+    parser = argparse.ArgumentParser(description="Stratified k-fold крос-валідація детектора")
+    parser.add_argument('--data', default='data/synthetic_iot_dataset.csv')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--model-type', default='classifier')
+    parser.add_argument('--epochs', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=128)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--report', default=DEFAULT_REPORT_PATH)
+    args = parser.parse_args()
+
+    loader = IoTDataLoader(args.data)
+    df = loader.load_data()
+    X, y, _ = loader.prepare_features()
+    result = cross_validate(X, y, df['label'], args.folds, args.model_type, args.epochs, args.batch_size,
+                            n_workers=args.workers, report_path=args.report)
+    for metric, stats in result['summary'].items():
+        if stats:
+            print(f"📊 {metric}: {stats['mean']:.4f} ± {stats['mean'] - stats['ci_low']:.4f}")
@@ -1,25 +1,199 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 from pathlib import Path
+from pandas.api.types import union_categoricals
+from .zeek_parser import is_zeek_log, iter_zeek_chunks, zeek_output_columns
+
+NUMERIC_FEATURES = ['dur', 'spkts', 'dpkts', 'sbytes', 'dbytes', 'rate', 'sttl', 'dttl']
+# Компактні типи: ~3x менше пам'яті, ніж float64/int64/object за замовчуванням
+COMPACT_DTYPES = {
+    'dur': 'float32', 'rate': 'float32',
+    'spkts': 'int32', 'dpkts': 'int32',
+    'sbytes': 'int64', 'dbytes': 'int64',
+    'sttl': 'uint8', 'dttl': 'uint8',
+    'label': 'category', 'device': 'category'
+}
+# Цілі колонки читаються як float64 (пропуски -> NaN), а в компактний тип переводить to_compact
+INTEGER_COLUMNS = [c for c, t in COMPACT_DTYPES.items() if t != 'category' and np.dtype(t).kind in 'iu']
+# Розширення файлів, які підхоплюються з каталогу
+SOURCE_PATTERNS = ('*.csv', '*.labeled', '*.log')
 
 class IoTDataLoader:
-    def __init__(self, data_path='data/iot23_dataset.csv'):
+    def __init__(self, data_path='data/iot23_dataset.csv', chunksize=500_000, cache_dir=None, n_workers=None):
+        # data_path - файл, каталог або glob-шаблон (наприклад 'captures/**/conn.log.labeled')
         self.data_path = data_path
+        self.chunksize = chunksize
+        self.cache_dir = cache_dir
+        self.n_workers = n_workers
         self.data = None
-        
-    def load_data(self, sample_size=None):
+        self.load_errors = {}
+
+    def load_data(self, sample_size=None, compact=False, stratify=False, quotas=None, seed=42):
         print(f"📥 Завантаження даних з {self.data_path}...")
+        self.load_errors = {}
         try:
-            self.data = pd.read_csv(self.data_path)
-            if sample_size:
-                self.data = self.data.sample(n=sample_size, random_state=42)
+            if sample_size or quotas:
+                self.data = self._sample_streaming(sample_size, compact, stratify, quotas, seed)
+            elif self.is_multi_source:
+                self.data = self._load_many()
+            elif self.cache_dir:
+                self.data = self._load_cached(compact)
+            elif compact or self.is_zeek:
+                self.data = concat_chunks(list(self.iter_chunks()))
+            else:
+                self.data = pd.read_csv(self.data_path)
             print(f"✅ Завантажено {len(self.data)} записів")
             return self.data
         except FileNotFoundError:
             print("❌ Файл не знайдено!")
             return None
-    
-    def get_basic_stats(self):
+
+    def _load_many(self):
+        # Кожен файл парситься в окремому процесі; помилки файлів збираються в load_errors
+        sources = self.resolve_sources()
+        if not sources:
+            raise FileNotFoundError(self.data_path)
+        n_workers = min(self.n_workers or os.cpu_count() or 1, len(sources))
+        args = [(path, self.chunksize) for path in sources]
+        if n_workers <= 1:
+            results = [_load_source(a) for a in args]
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                results = list(pool.map(_load_source, args))
+
+        self.load_errors = {path: error for path, _, error in results if error}
+        for path, error in self.load_errors.items():
+            print(f"⚠️ {path}: {error}")
+        loaded = []
+        for path, df, error in results:
+            if df is None:
+                continue
+            expected = list(loaded[0][1].columns) if loaded else None
+            if expected is not None and list(df.columns) != expected:
+                self.load_errors[path] = f"колонки {list(df.columns)} не збігаються з {expected}"
+                print(f"⚠️ {path}: {self.load_errors[path]}")
+                continue
+            loaded.append((path, df))
+        frames = []
+        names = [path for path, _ in loaded]
+        for code, (path, df) in enumerate(loaded):
+            df['source'] = pd.Categorical.from_codes(np.full(len(df), code), categories=names)
+            frames.append(df)
+        print(f"📂 Файлів: {len(frames)}/{len(sources)}")
+        return concat_chunks(frames)
+
+    def _load_cached(self, compact):
+        # Перший виклик конвертує CSV у колонковий кеш, наступні відкривають його через mmap
+        from .column_cache import ColumnarCache
+        if compact or self.is_zeek:
+            build = lambda: concat_chunks(list(self.iter_chunks()))
+        else:
+            build = lambda: pd.read_csv(self.data_path)
+        variant = 'compact' if compact else 'full'
+        return ColumnarCache(self.cache_dir).load_or_build(self.data_path, build, variant)
+
+    def _sample_streaming(self, sample_size, compact, stratify, quotas, seed):
+        # Вибірка за один прохід: у пам'яті лише резервуар і поточний чанк
+        from .sampling import ReservoirSampler, StratifiedReservoirSampler
+        if stratify or quotas:
+            sampler = StratifiedReservoirSampler(sample_size, quotas=quotas, seed=seed)
+        else:
+            sampler = ReservoirSampler(sample_size, seed=seed)
+        for chunk in self.iter_chunks(compact=compact):
+            sampler.update(chunk)
+        return sampler.result()
+
+    @property
+    def is_multi_source(self):
+        path = str(self.data_path)
+        return os.path.isdir(path) or glob.has_magic(path)
+
+    def resolve_sources(self):
+        path = str(self.data_path)
+        if os.path.isdir(path):
+            found = set()
+            for pattern in SOURCE_PATTERNS:
+                found.update(glob.glob(os.path.join(path, '**', pattern), recursive=True))
+            return sorted(found)
+        if glob.has_magic(path):
+            return sorted(p for p in glob.glob(path, recursive=True) if os.path.isfile(p))
+        return [path]
+
+    @property
+    def is_zeek(self):
+        # Zeek conn.log(.labeled) з IoT-23 читається напряму, без конвертації в CSV
+        return is_zeek_log(self.data_path)
+
+    def _source_failed(self, path, error):
+        self.load_errors[path] = f"{type(error).__name__}: {error}"
+        print(f"⚠️ {path}: {self.load_errors[path]}")
+
+    def available_columns(self):
+        if self.is_multi_source:
+            # Колонки першого файлу, який вдається прочитати
+            for path in self.resolve_sources():
+                try:
+                    return IoTDataLoader(path).available_columns()
+                except (ValueError, OSError) as e:
+                    self._source_failed(path, e)
+            return []
+        if self.is_zeek:
+            return zeek_output_columns(self.data_path)
+        return list(pd.read_csv(self.data_path, nrows=0).columns)
+
+    def iter_chunks(self, columns=None, chunksize=None, compact=True):
+        # Читає лише потрібні колонки (ознаки, label, device) з компактними типами;
+        # compact=False - усі колонки з типами, які визначить pandas
+        if self.is_multi_source:
+            # Файл, що не парситься, потрапляє в load_errors і пропускається, як у _load_many
+            # (чанки, які він встиг віддати до помилки, лишаються)
+            for path in self.resolve_sources():
+                try:
+                    yield from IoTDataLoader(path, self.chunksize).iter_chunks(columns, chunksize, compact)
+                except Exception as e:
+                    self._source_failed(path, e)
+            return
+        available = self.available_columns()
+        if not compact:
+            columns = available
+        elif columns is None:
+            columns = NUMERIC_FEATURES + ['label', 'device']
+        usecols = [c for c in columns if c in available]
+        if self.is_zeek:
+            for chunk in iter_zeek_chunks(self.data_path, chunksize or self.chunksize):
+                yield chunk[usecols]
+            return
+        dtype = None
+        if compact:
+            dtype = {c: 'float64' if c in INTEGER_COLUMNS else COMPACT_DTYPES[c]
+                     for c in usecols if c in COMPACT_DTYPES}
+        reader = pd.read_csv(self.data_path, usecols=usecols, dtype=dtype,
+                             chunksize=chunksize or self.chunksize)
+        with reader:
+            for chunk in reader:
+                chunk = chunk[usecols]
+                yield to_compact(chunk, self.data_path) if compact else chunk
+
+    def iter_feature_batches(self, chunksize=None):
+        # Ітератор батчів (X float32, y int8 або None) для даних, що не вміщуються в пам'ять
+        for chunk in self.iter_chunks(NUMERIC_FEATURES + ['label'], chunksize):
+            features = [f for f in NUMERIC_FEATURES if f in chunk.columns]
+            X = chunk[features].to_numpy(dtype=np.float32)
+            y = None
+            if 'label' in chunk.columns:
+                y = (chunk['label'] != 'Benign').to_numpy(dtype=np.int8)
+            yield X, y
+
+    def get_basic_stats(self, streaming=False, quantiles=(0.01, 0.25, 0.5, 0.75, 0.99)):
+        # streaming=True: один прохід по файлу чанками, без завантаження в self.data
+        if streaming:
+            from .streaming_stats import compute_stats
+            self.load_errors = {}
+            stats = compute_stats(self.resolve_sources(), self.n_workers, self.chunksize, self.load_errors)
+            return stats.result(quantiles)
         if self.data is None:
             return None
         stats = {
@@ -29,12 +203,56 @@ class IoTDataLoader:
             'label_distribution': self.data['label'].value_counts().to_dict() if 'label' in self.data.columns else None
         }
         return stats
-    
+
     def prepare_features(self):
-        numeric_features = ['dur', 'spkts', 'dpkts', 'sbytes', 'dbytes', 'rate', 'sttl', 'dttl']
-        available_features = [f for f in numeric_features if f in self.data.columns]
+        available_features = [f for f in NUMERIC_FEATURES if f in self.data.columns]
         X = self.data[available_features]
         y = None
         if 'label' in self.data.columns:
             y = (self.data['label'] != 'Benign').astype(int)
         return X, y, available_features
+
+
+def _load_source(args):
+    path, chunksize = args
+    try:
+        df = concat_chunks(list(IoTDataLoader(path, chunksize).iter_chunks()))
+        missing = [f for f in NUMERIC_FEATURES if f not in df.columns]
+        if missing:
+            return path, None, f"відсутні ознаки {missing}"
+        return path, df, None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def to_compact(chunk, source=''):
+    """Цілі колонки з float64 у компактні типи: пропуски -> 0, значення поза діапазоном
+    типу (наприклад TTL 300 для uint8) обрізаються до меж замість тихого переповнення"""
+    for c in INTEGER_COLUMNS:
+        if c not in chunk.columns:
+            continue
+        values = chunk[c]
+        info = np.iinfo(COMPACT_DTYPES[c])
+        missing = int(values.isna().sum())
+        out_of_range = int(((values < info.min) | (values > info.max)).sum())
+        if missing:
+            print(f"⚠️ {source} {c}: {missing} пропусків замінено на 0")
+        if out_of_range:
+            print(f"⚠️ {source} {c}: {out_of_range} значень поза [{info.min}, {info.max}] обрізано")
+        chunk[c] = values.fillna(0).clip(info.min, info.max).astype(COMPACT_DTYPES[c])
+    return chunk
+
+
+def concat_chunks(chunks):
+    # pd.concat перетворює категорії з різними наборами значень на object, тому об'єднуємо їх окремо
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0].reset_index(drop=True)
+    columns = {}
+    for col in chunks[0].columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            columns[col] = union_categoricals([chunk[col] for chunk in chunks])
+        else:
+            columns[col] = np.concatenate([chunk[col].to_numpy() for chunk in chunks])
+    return pd.DataFrame(columns)
@@ -0,0 +1,83 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from .simulator import IoTTrafficSimulator
+from .dataset_writer import DatasetWriter
+
+# Кількість пакетів кожного типу на один пристрій (як у quick_start.py)
+DEFAULT_PLAN = {'normal': 1000, 'ddos': 200, 'port_scan': 150, 'mirai': 100}
+# Фіксований початок часу, щоб датасет для одного seed був однаковим між запусками
+DEFAULT_START_TIME = datetime(2024, 1, 1)
+# Симульований годинник як у TrafficStream: рядок k плану має час start_time + k / flows_per_second
+DEFAULT_FLOWS_PER_SECOND = 1000
+
+
+def build_shards(plan=None, device_types=None, shard_size=100_000):
+    """Розбиває план (пристрій × тип трафіку × кількість) на шарди фіксованого розміру"""
+    plan = DEFAULT_PLAN if plan is None else plan
+    device_types = IoTTrafficSimulator().device_types if device_types is None else device_types
+    shards = []
+    for device in device_types:
+        for traffic_type, count in plan.items():
+            for start in range(0, count, shard_size):
+                shards.append((device, traffic_type, min(shard_size, count - start)))
+    return shards
+
+
+def _generate_shard(task):
+    device, traffic_type, n_packets, seed_seq, start_time, first_row, flows_per_second = task
+    rng = np.random.default_rng(seed_seq)
+    # Час кожного рядка залежить лише від його позиції в плані, а не від процесу чи моменту запуску
+    offsets_us = ((first_row + np.arange(n_packets)) / flows_per_second * 1e6).astype(np.int64)
+    timestamps = np.datetime64(start_time, 'us') + offsets_us.astype('timedelta64[us]')
+    return IoTTrafficSimulator().generate_batch(device, traffic_type, n_packets, rng=rng, timestamp=timestamps)
+
+
+def iter_shards(plan=None, seed=42, n_workers=None, shard_size=100_000, device_types=None,
+                start_time=DEFAULT_START_TIME, flows_per_second=DEFAULT_FLOWS_PER_SECOND):
+    """Генерує шарди у порядку плану. Кожен шард має власний потік RNG з SeedSequence(seed),
+    тому результат залежить лише від seed і shard_size, а не від кількості процесів"""
+    shards = build_shards(plan, device_types, shard_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(shards))
+    first_rows = np.concatenate([[0], np.cumsum([n for _, _, n in shards])[:-1]]).astype(np.int64)
+    tasks = [shard + (seed_seq, start_time, int(first_row), flows_per_second)
+             for shard, seed_seq, first_row in zip(shards, seeds, first_rows)]
+    n_workers = n_workers or os.cpu_count() or 1
+
+    if n_workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _generate_shard(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        # Обмежене вікно задач: у пам'яті не більше 2 * n_workers готових шардів
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(_generate_shard, task))
+            if len(pending) >= 2 * n_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def generate_dataset(plan=None, seed=42, n_workers=None, shard_size=100_000, device_types=None,
+                     start_time=DEFAULT_START_TIME, flows_per_second=DEFAULT_FLOWS_PER_SECOND):
+    """Паралельна відтворювана генерація всього датасету в один DataFrame"""
+    shards = iter_shards(plan, seed, n_workers, shard_size, device_types, start_time, flows_per_second)
+    return pd.concat(list(shards), ignore_index=True)
+
+
+def write_dataset(path, plan=None, seed=42, n_workers=None, shard_size=100_000, device_types=None,
+                  start_time=DEFAULT_START_TIME, flows_per_second=DEFAULT_FLOWS_PER_SECOND, **writer_options):
+    """Генерує датасет і одразу дописує шарди на диск; у пам'яті лише вікно шардів"""
+    label_counts = {}
+    with DatasetWriter(path, **writer_options) as writer:
+        for shard in iter_shards(plan, seed, n_workers, shard_size, device_types, start_time, flows_per_second):
+            writer.write(shard)
+            for label, count in shard['label'].value_counts().items():
+                label_counts[label] = label_counts.get(label, 0) + int(count)
+    return {'rows': writer.rows_written, 'files': writer.files,
+            'label_distribution': {k: v for k, v in label_counts.items() if v}}
@@ -0,0 +1,89 @@
+import glob
+import os
+
+
+class DatasetWriter:
+    """Інкрементальний запис батчів на диск (CSV або Parquet) без накопичення в пам'яті.
+
+    CSV: один файл, заголовок пишеться з першим батчем, після кожного батчу - flush.
+    Parquet: path - каталог з частинами part-00000.parquet; кожен батч стає row group(ами),
+    частина закривається після rows_per_file рядків і атомарно перейменовується, тому
+    перерваний запуск зберігає всі вже завершені частини.
+    """
+
+    def __init__(self, path, format=None, rows_per_file=1_000_000, row_group_size=100_000, compression='snappy'):
+        self.path = str(path)
+        self.format = format or ('csv' if self.path.endswith('.csv') else 'parquet')
+        if self.format not in ('csv', 'parquet'):
+            raise ValueError(f"Непідтримуваний формат: {self.format}")
+        self.rows_per_file = rows_per_file
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.rows_written = 0
+        self.files = []
+        self._file = None
+        self._writer = None
+        self._part_rows = 0
+        self._part_path = None
+
+        parent = os.path.dirname(self.path) if self.format == 'csv' else self.path
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        if self.format == 'parquet':
+            # Старі частини від попереднього запуску не змішуємо з новими
+            for old in glob.glob(os.path.join(self.path, 'part-*.parquet*')):
+                os.remove(old)
+
+    def write(self, df):
+        if len(df) == 0:
+            return
+        if self.format == 'csv':
+            self._write_csv(df)
+        else:
+            self._write_parquet(df)
+        self.rows_written += len(df)
+
+    def _write_csv(self, df):
+        if self._file is None:
+            self._file = open(self.path, 'w', newline='')
+            df.to_csv(self._file, index=False)
+            self.files.append(self.path)
+        else:
+            df.to_csv(self._file, index=False, header=False)
+        self._file.flush()
+
+    def _write_parquet(self, df):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Для запису Parquet потрібен pyarrow: pip install pyarrow") from e
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._part_path = os.path.join(self.path, f"part-{len(self.files):05d}.parquet")
+            self._writer = pq.ParquetWriter(self._part_path + '.tmp', table.schema, compression=self.compression)
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+        self._part_rows += len(df)
+        if self._part_rows >= self.rows_per_file:
+            self._close_part()
+
+    def _close_part(self):
+        self._writer.close()
+        os.replace(self._part_path + '.tmp', self._part_path)
+        self.files.append(self._part_path)
+        self._writer = None
+        self._part_rows = 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._writer is not None:
+            self._close_part()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
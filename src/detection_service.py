@@ -0,0 +1,211 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+FEATURE_COLUMNS = ['dur', 'spkts', 'dpkts', 'sbytes', 'dbytes', 'rate', 'sttl', 'dttl']
+# Маркер зупинки в черзі: _run дообробляє зібраний батч і завершується сам
+_STOP = object()
+
+
+class MicroBatchDetectionService:
+    """Asyncio-сервіс детекції з мікробатчингом.
+
+    Запити (по одному потоку) стають у чергу; батч віддається детектору, щойно набралось
+    max_batch_size рядків або минуло max_delay_ms від першого запиту в батчі. Кожен запит
+    отримує future з (is_anomaly, score). Черга обмежена max_queue_size: detect() чекає,
+    поки звільниться місце (backpressure), submit_nowait() кидає asyncio.QueueFull.
+    detector - будь-який об'єкт з detect_anomalies(X, threshold), наприклад
+    IoTAnomalyDetector або FusedInferenceEngine.
+    """
+
+    def __init__(self, detector, max_batch_size=256, max_delay_ms=5.0, max_queue_size=10_000, threshold=None):
+        self.detector = detector
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000.0
+        self.max_queue_size = max_queue_size
+        self.threshold = threshold
+        self.batches = 0
+        self.flows = 0
+        self._queue = None
+        self._task = None
+        # Один потік: модель викликається послідовно і не блокує event loop
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def stop(self):
+        if self._task is not None:
+            # Без cancel(): батч, що збирається або вже в детекторі, завершується штатно
+            await self._queue.put(_STOP)
+            await self._task
+            self._task = None
+        # Запити, що встигли стати в чергу після маркера, обробляються батчами max_batch_size
+        pending = []
+        while self._queue is not None and not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                pending.append(item)
+            if len(pending) == self.max_batch_size:
+                await self._flush(pending)
+                pending = []
+        if pending:
+            await self._flush(pending)
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def _as_row(self, flow):
+        if isinstance(flow, dict):
+            flow = [flow[c] for c in FEATURE_COLUMNS]
+        row = np.asarray(flow, dtype=np.float32)
+        # Некоректний рядок відхиляється до черги, щоб не зіпсувати батч інших запитів
+        if row.shape != (len(FEATURE_COLUMNS),):
+            raise ValueError(f"Очікується {len(FEATURE_COLUMNS)} ознак, отримано форму {row.shape}")
+        return row
+
+    async def detect(self, flow):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((self._as_row(flow), future))
+        return await future
+
+    def submit_nowait(self, flow):
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((self._as_row(flow), future))
+        return future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        batch, stopping = [], False
+        try:
+            while not stopping:
+                item = await self._queue.get()
+                if item is _STOP:
+                    return
+                batch = [item]
+                deadline = loop.time() + self.max_delay
+                while len(batch) < self.max_batch_size:
+                    # Спершу забираємо все, що вже в черзі, без очікування
+                    if not self._queue.empty():
+                        item = self._queue.get_nowait()
+                    else:
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            item = await asyncio.wait_for(self._queue.get(), timeout)
+                        except asyncio.TimeoutError:
+                            break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                await self._flush(batch)
+                batch = []
+        except asyncio.CancelledError:
+            # Задачу скасовано ззовні (наприклад, закриття event loop): запити батчу не повинні висіти
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("Сервіс детекції зупинено"))
+            raise
+
+    async def _flush(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            X = np.stack([row for row, _ in batch])
+            anomalies, scores, _ = await loop.run_in_executor(
+                self._executor, self.detector.detect_anomalies, X, self.threshold)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.flows += len(batch)
+        for i, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result((bool(anomalies[i]), float(scores[i])))
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'flows': self.flows,
+            'avg_batch_size': self.flows / self.batches if self.batches else 0.0,
+            'queue_size': self._queue.qsize() if self._queue is not None else 0
+        }
+
+    async def serve_unix(self, path):
+        """Unix-сокет з JSON-рядками: запит {"id": ..., "features": [8 чисел] або {назва: значення}},
+        відповідь {"id": ..., "anomaly": bool, "score": float} (або "error")"""
+
+        async def handle(reader, writer):
+            tasks = set()
+
+            async def answer(request):
+                # Валідний JSON, але не об'єкт ([1], "x", 3): відповідь з помилкою, з'єднання живе
+                request_id = request.get('id') if isinstance(request, dict) else None
+                try:
+                    if not isinstance(request, dict):
+                        raise ValueError("Запит має бути JSON-об'єктом з полем features")
+                    anomaly, score = await self.detect(request['features'])
+                    response = {'id': request_id, 'anomaly': anomaly, 'score': score}
+                except Exception as e:
+                    response = {'id': request_id, 'error': str(e)}
+                writer.write((json.dumps(response, ensure_ascii=False) + '\n').encode())
+
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as e:
+                    writer.write((json.dumps({'error': f"Некоректний JSON: {e}"}, ensure_ascii=False) + '\n').encode())
+                    continue
+                task = asyncio.create_task(answer(request))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+            await writer.drain()
+            writer.close()
+
+        return await asyncio.start_unix_server(handle, path=path)
+
+
+async def _serve(args):
+    if args.bundle:
+        from .model_bundle import BundleDetector
+        detector = BundleDetector.load(args.bundle)
+    elif args.fused:
+        from .fast_inference import FusedInferenceEngine
+        detector = FusedInferenceEngine.load(args.fused)
+    else:
+        from .model_training import IoTAnomalyDetector
+        detector = IoTAnomalyDetector(input_dim=len(FEATURE_COLUMNS))
+        detector.load_model()
+    service = MicroBatchDetectionService(detector, args.batch_size, args.delay_ms, args.queue_size)
+    async with service:
+        server = await service.serve_unix(args.socket)
+        print(f"🛡️ Сервіс детекції слухає {args.socket} (батч {args.batch_size}, затримка {args.delay_ms} мс)")
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Мікробатчинговий сервіс детекції аномалій")
+    parser.add_argument('--socket', default='/tmp/iot_detector.sock')
+    parser.add_argument('--bundle', help="Шлях до бандла моделі (без TensorFlow)")
+    parser.add_argument('--fused', help="Шлях до .npz FusedInferenceEngine (без TensorFlow)")
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--delay-ms', type=float, default=5.0)
+    parser.add_argument('--queue-size', type=int, default=10_000)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        print("\n✅ Сервіс зупинено")
@@ -0,0 +1,105 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .model_registry import ModelRegistry
+
+DEFAULT_BUNDLE_PATH = 'models/anomaly_detector.bundle'
+DEFAULT_MODEL_PATH = 'models/anomaly_detector.h5'
+DEFAULT_SCALER_PATH = 'models/preprocessor.pkl'
+
+
+class DetectorCache:
+    """Один детектор на процес, спільний для всіх сесій, поверх ModelRegistry.
+
+    get() щоразу порівнює розмір і mtime усіх файлів моделі - бандла, h5 і pkl
+    (os.stat, мікросекунди). Якщо вони змінились, новіший артефакт реєструється у реєстрі
+    і підміняє активну модель у фоновому потоці (stage + promote з прогрівом), а сесії
+    тим часом отримують поточну модель без очікування. Чекає лише найперший виклик, коли
+    моделі ще немає. Пара h5+pkl, перезаписана після бандла (скрипти, що зберігають лише
+    save_model), конвертується в бандл, тож усі сесії обслуговує BundleDetector.
+    """
+
+    def __init__(self, bundle_path=DEFAULT_BUNDLE_PATH, model_path=DEFAULT_MODEL_PATH,
+                 scaler_path=DEFAULT_SCALER_PATH, registry=None, registry_dir='models/registry'):
+        self.bundle_path = bundle_path
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.registry = registry or ModelRegistry(registry_dir)
+        self.loads = 0
+        self._lock = threading.Lock()
+        self._loaded_signature = None
+        self._refreshing = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def _stat(self, path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def _signature(self):
+        # Відбиток усіх артефактів: зміна будь-якого з них запускає оновлення
+        return tuple((path, self._stat(path)) for path in (self.bundle_path, self.model_path, self.scaler_path))
+
+    def _source(self, signature):
+        """'bundle' або 'keras' - новіший з наявних артефактів"""
+        (_, bundle), (_, model), (_, scaler) = signature
+        keras_mtime = max(model[1], scaler[1]) if model and scaler else None
+        if bundle and (keras_mtime is None or bundle[1] >= keras_mtime):
+            return 'bundle'
+        if keras_mtime is not None:
+            return 'keras'
+        raise FileNotFoundError(f"Модель не знайдено: немає {self.bundle_path} або {self.model_path} + {self.scaler_path}")
+
+    def _note(self, source, signature):
+        # Примітка версії в реєстрі: за нею після перезапуску видно, що ці файли вже активні
+        files = signature[:1] if source == 'bundle' else signature[1:]
+        return 'detector_cache ' + json.dumps([[path, stat] for path, stat in files])
+
+    def _register(self, source, note):
+        if source == 'bundle':
+            return self.registry.register(self.bundle_path, note)
+        from .model_training import IoTAnomalyDetector
+        detector = IoTAnomalyDetector(input_dim=8)
+        detector.load_model(self.model_path, self.scaler_path)
+        tmp_dir = tempfile.mkdtemp(prefix='iot_cache_')
+        try:
+            path = os.path.join(tmp_dir, 'converted.bundle')
+            detector.save_bundle(path)
+            return self.registry.register(path, note)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _refresh(self, signature):
+        source = self._source(signature)
+        note = self._note(source, signature)
+        active = self.registry.active_version
+        active_note = next((v['note'] for v in self.registry.versions() if v['version'] == active), None)
+        if active_note != note:
+            self.registry.promote(self._register(source, note))
+            self.loads += 1
+        with self._lock:
+            self._loaded_signature = signature
+
+    def get(self):
+        """Поточний детектор; FileNotFoundError, якщо модель ще не навчена"""
+        signature = self._signature()
+        with self._lock:
+            # Одне оновлення на відбиток: інші сесії не чекають і не запускають дублікатів
+            if signature != self._loaded_signature and (self._refreshing is None or self._refreshing[0] != signature):
+                self._refreshing = (signature, self._executor.submit(self._refresh, signature))
+            refreshing = self._refreshing
+        detector = self.registry.active_detector
+        if detector is None and refreshing is not None:
+            # Моделі ще немає зовсім - тут чекати доводиться (помилка завантаження піднімається)
+            refreshing[1].result()
+            detector = self.registry.active_detector
+        return detector
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.registry.close()
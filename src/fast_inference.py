@@ -0,0 +1,128 @@
+import numpy as np
+
+_ACTIVATIONS = {
+    'linear': lambda z: z,
+    'relu': lambda z: np.maximum(z, 0, out=z),
+    'tanh': np.tanh,
+    'sigmoid': lambda z: 1.0 / (1.0 + np.exp(-np.clip(z, -80, 80))),
+}
+
+
+def layer_specs_from_keras(model):
+    """Опис шарів Sequential-моделі як список словників з numpy-вагами (без TensorFlow далі)"""
+    specs = []
+    for layer in model.layers:
+        kind = layer.__class__.__name__
+        config = layer.get_config()
+        weights = layer.get_weights()
+        if kind == 'Dense':
+            specs.append({'type': 'dense', 'activation': config.get('activation', 'linear'),
+                          'kernel': weights[0], 'bias': weights[1] if config.get('use_bias', True) else None})
+        elif kind == 'BatchNormalization':
+            weights = list(weights)
+            gamma = weights.pop(0) if config.get('scale', True) else None
+            beta = weights.pop(0) if config.get('center', True) else None
+            mean, var = weights
+            specs.append({'type': 'batchnorm', 'gamma': gamma, 'beta': beta, 'mean': mean, 'var': var,
+                          'epsilon': config.get('epsilon', 1e-3)})
+        elif kind == 'Activation':
+            specs.append({'type': 'activation', 'activation': config['activation']})
+        elif kind in ('Dropout', 'InputLayer', 'GaussianNoise'):
+            # В режимі inference ці шари - тотожні перетворення
+            continue
+        else:
+            raise ValueError(f"Шар {kind} не підтримується fused-рушієм")
+    return specs
+
+
+def fold_layers(specs, scaler_mean=None, scaler_scale=None):
+    """Згортає StandardScaler і BatchNormalization (inference) у ваги Dense.
+
+    Повертає список (W, b, activation). Перед кожним Dense накопичується афінне
+    перетворення x * a + c (scaler або BN після активації) і вноситься у W та b.
+    """
+    n_inputs = len(specs[0]['kernel']) if specs and specs[0]['type'] == 'dense' else len(scaler_mean)
+    a = np.ones(n_inputs) if scaler_scale is None else 1.0 / np.asarray(scaler_scale, dtype=np.float64)
+    c = np.zeros(n_inputs) if scaler_mean is None else -np.asarray(scaler_mean, dtype=np.float64) * a
+    stages = []
+    for spec in specs:
+        if spec['type'] == 'dense':
+            W = np.asarray(spec['kernel'], dtype=np.float64)
+            b = np.zeros(W.shape[1]) if spec['bias'] is None else np.asarray(spec['bias'], dtype=np.float64)
+            stages.append([a[:, None] * W, c @ W + b, spec['activation']])
+            a, c = np.ones(W.shape[1]), np.zeros(W.shape[1])
+        elif spec['type'] == 'batchnorm':
+            mean = np.asarray(spec['mean'], dtype=np.float64)
+            s = 1.0 / np.sqrt(np.asarray(spec['var'], dtype=np.float64) + spec['epsilon'])
+            if spec['gamma'] is not None:
+                s = s * spec['gamma']
+            t = -mean * s + (0.0 if spec['beta'] is None else spec['beta'])
+            if stages and stages[-1][2] == 'linear' and np.all(a == 1) and np.all(c == 0):
+                # BN одразу після лінійного Dense - вносимо у його ж ваги
+                stages[-1][0] = stages[-1][0] * s
+                stages[-1][1] = stages[-1][1] * s + t
+            else:
+                a, c = a * s, c * s + t
+        elif spec['type'] == 'activation':
+            if stages and stages[-1][2] == 'linear' and np.all(a == 1) and np.all(c == 0):
+                stages[-1][2] = spec['activation']
+            else:
+                stages.append([np.diag(a), c, spec['activation']])
+                a, c = np.ones(len(a)), np.zeros(len(a))
+    if not (np.all(a == 1) and np.all(c == 0)):
+        stages.append([np.diag(a), c, 'linear'])
+    for W, b, activation in stages:
+        if activation not in _ACTIVATIONS:
+            raise ValueError(f"Активація {activation} не підтримується fused-рушієм")
+    return [(W.astype(np.float32), b.astype(np.float32), activation) for W, b, activation in stages]
+
+
+class FusedInferenceEngine:
+    """Інференс детектора кількома float32 матричними множеннями NumPy, без TensorFlow.
+
+    Повертає ті самі anomaly scores, що й IoTAnomalyDetector.detect_anomalies (у межах
+    похибки float32), але без накладних витрат scaler.transform і model.predict.
+    """
+
+    def __init__(self, stages, threshold=0.5):
+        self.stages = stages
+        self.threshold = threshold
+
+    @classmethod
+    def from_detector(cls, detector, threshold=0.5):
+        specs = layer_specs_from_keras(detector.model)
+        return cls(fold_layers(specs, detector.scaler.mean_, detector.scaler.scale_), threshold)
+
+    def predict(self, X):
+        h = np.asarray(X, dtype=np.float32)
+        if h.ndim == 1:
+            h = h[None, :]
+        for W, b, activation in self.stages:
+            h = _ACTIVATIONS[activation](h @ W + b)
+        return h.reshape(len(h), -1)[:, 0] if h.shape[1] == 1 else h
+
+    def detect_anomalies(self, X, threshold=None):
+        anomaly_scores = self.predict(X)
+        if threshold is None:
+            threshold = self.threshold
+        return anomaly_scores > threshold, anomaly_scores, threshold
+
+    def max_abs_diff(self, detector, X):
+        # Перевірка відповідності Keras-моделі: максимальна різниця scores
+        _, reference, _ = detector.detect_anomalies(X)
+        return float(np.max(np.abs(self.predict(X) - reference)))
+
+    def save(self, path):
+        arrays = {'threshold': np.float32(self.threshold),
+                  'activations': np.array([activation for _, _, activation in self.stages])}
+        for i, (W, b, _) in enumerate(self.stages):
+            arrays[f'W{i}'] = W
+            arrays[f'b{i}'] = b
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        activations = [str(a) for a in data['activations']]
+        stages = [(data[f'W{i}'], data[f'b{i}'], a) for i, a in enumerate(activations)]
+        return cls(stages, float(data['threshold']))
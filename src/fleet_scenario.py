@@ -0,0 +1,137 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from .simulator import IoTTrafficSimulator
+
+# Статуси пристроїв у DeviceFleet.status
+SUSCEPTIBLE = 0
+INFECTED = 1
+
+
+class DeviceFleet:
+    """Парк пристроїв у вигляді масивів: id, тип (індекс у device_types) і статус зараження"""
+
+    def __init__(self, n_devices, simulator=None, device_mix=None, seed=None):
+        self.simulator = simulator or IoTTrafficSimulator()
+        rng = np.random.default_rng(seed)
+        n_types = len(self.simulator.device_types)
+        if device_mix is None:
+            p = None
+        else:
+            p = np.array([device_mix.get(d, 0.0) for d in self.simulator.device_types], dtype=np.float64)
+            p = p / p.sum()
+        self.device_id = np.arange(n_devices, dtype=np.int32)
+        self.device_type = rng.choice(n_types, size=n_devices, p=p).astype(np.int8)
+        self.status = np.full(n_devices, SUSCEPTIBLE, dtype=np.int8)
+        self.infected_at = np.full(n_devices, -1, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.device_id)
+
+    def infect(self, mask, tick):
+        new = mask & (self.status == SUSCEPTIBLE)
+        self.status[new] = INFECTED
+        self.infected_at[new] = tick
+        return int(new.sum())
+
+    @property
+    def infected(self):
+        return self.status == INFECTED
+
+    def summary(self):
+        return {
+            'devices': len(self),
+            'infected': int(self.infected.sum()),
+            'infected_fraction': float(self.infected.mean()) if len(self) else 0.0
+        }
+
+
+class MiraiInfection:
+    """Поширення Mirai за SI-моделлю: кожен вразливий пристрій заражається з ймовірністю
+    1 - exp(-infection_rate * частка_заражених). Заражені пристрої генерують Mirai-трафік"""
+
+    def __init__(self, start_tick=0, initial_infected=10, infection_rate=0.5, scan_prob=0.8, end_tick=None):
+        self.start_tick = start_tick
+        self.initial_infected = initial_infected
+        self.infection_rate = infection_rate
+        self.scan_prob = scan_prob
+        self.end_tick = end_tick
+
+    def apply(self, scenario, tick, traffic):
+        fleet, rng = scenario.fleet, scenario.rng
+        if tick < self.start_tick or (self.end_tick is not None and tick >= self.end_tick):
+            return
+        if tick == self.start_tick:
+            n_seed = min(self.initial_infected, len(fleet))
+            seeds = np.zeros(len(fleet), dtype=bool)
+            seeds[rng.choice(len(fleet), size=n_seed, replace=False)] = True
+            fleet.infect(seeds, tick)
+        else:
+            p = 1.0 - np.exp(-self.infection_rate * fleet.infected.mean())
+            fleet.infect(rng.random(len(fleet)) < p, tick)
+        scanning = fleet.infected & (rng.random(len(fleet)) < self.scan_prob)
+        traffic[scanning] = scenario.traffic_code('mirai')
+
+
+class DDoSAttack:
+    """Скоординована DDoS-атака заражених пристроїв у вікні [start_tick, start_tick + duration)"""
+
+    def __init__(self, start_tick, duration, participation=1.0):
+        self.start_tick = start_tick
+        self.duration = duration
+        self.participation = participation
+
+    def apply(self, scenario, tick, traffic):
+        if not self.start_tick <= tick < self.start_tick + self.duration:
+            return
+        fleet, rng = scenario.fleet, scenario.rng
+        attacking = fleet.infected & (rng.random(len(fleet)) < self.participation)
+        traffic[attacking] = scenario.traffic_code('ddos')
+
+
+class FleetScenario:
+    """Покрокова симуляція парку: кожен тік векторизовано оновлює весь парк і повертає потоки.
+
+    Звичайний пристрій генерує потік з ймовірністю activity за тік; пристрої, яким кампанія
+    призначила атакуючий трафік, генерують потік завжди.
+    """
+
+    def __init__(self, fleet, campaigns=(), activity=0.1, tick_seconds=1.0, start_time=None, seed=None):
+        self.fleet = fleet
+        self.simulator = fleet.simulator
+        self.campaigns = list(campaigns)
+        self.activity = activity
+        self.tick_seconds = tick_seconds
+        self.start_time = np.datetime64(start_time or datetime.now(), 'us')
+        self.rng = np.random.default_rng(seed)
+        self.tick = 0
+        self.history = []
+
+    def traffic_code(self, traffic_type):
+        return self.simulator.traffic_types.index(traffic_type)
+
+    def step(self):
+        n = len(self.fleet)
+        normal = self.traffic_code('normal')
+        traffic = np.full(n, normal, dtype=np.int8)
+        for campaign in self.campaigns:
+            campaign.apply(self, self.tick, traffic)
+
+        emitting = np.flatnonzero((traffic != normal) | (self.rng.random(n) < self.activity))
+        offsets_us = ((self.tick + self.rng.random(len(emitting))) * self.tick_seconds * 1e6).astype(np.int64)
+        timestamps = self.start_time + offsets_us.astype('timedelta64[us]')
+        batch = self.simulator.generate_mixed_batch(self.fleet.device_type[emitting], traffic[emitting],
+                                                    rng=self.rng, timestamp=timestamps)
+        batch.insert(1, 'device_id', self.fleet.device_id[emitting])
+        batch['tick'] = np.int32(self.tick)
+
+        self.history.append(dict(self.fleet.summary(), tick=self.tick, flows=len(batch)))
+        self.tick += 1
+        return batch
+
+    def run(self, n_ticks):
+        for _ in range(n_ticks):
+            yield self.step()
+
+    def history_frame(self):
+        return pd.DataFrame(self.history)
@@ -0,0 +1,203 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+SEARCH_SPACE = {
+    'hidden_units': [(32, 16), (64, 32), (128, 64, 32), (256, 128, 64)],
+    'dropout_rates': [0.1, 0.2, 0.3],
+    'head_units': [0, 8, 16],
+    'learning_rate': [3e-4, 1e-3, 3e-3],
+    'batch_size': [64, 128, 256]
+}
+
+_DATA_FILES = ('X_train', 'y_train', 'X_val', 'y_val')
+
+
+def sample_configs(n_configs, space=None, seed=42):
+    """n_configs різних випадкових конфігурацій з простору пошуку"""
+    space = space or SEARCH_SPACE
+    rng = np.random.default_rng(seed)
+    n_total = math.prod(len(values) for values in space.values())
+    configs, seen = [], set()
+    while len(configs) < min(n_configs, n_total):
+        config = {key: values[rng.integers(len(values))] for key, values in space.items()}
+        key = json.dumps(config, sort_keys=True, default=list)
+        if key not in seen:
+            seen.add(key)
+            configs.append(config)
+    return configs
+
+
+def rung_epochs(min_epochs, max_epochs, eta):
+    """Бюджет (епохи) на кожному щаблі successive halving: min_epochs * eta^i, не більше max_epochs"""
+    budgets = [min_epochs]
+    while budgets[-1] < max_epochs:
+        budgets.append(min(budgets[-1] * eta, max_epochs))
+    return budgets
+
+
+def _init_worker(n_threads):
+    # Кілька TF-процесів на одній машині: кожному лише свою частку ядер
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _single_flow_latency_us(model, X, repeats=50, blocks=5):
+    # Затримка одного потоку у fused NumPy-рушії (дані вже масштабовані, scaler не потрібен).
+    # Воркери міряють паралельно з навчанням інших конфігурацій, тому беремо найкращий блок
+    from .fast_inference import FusedInferenceEngine, fold_layers, layer_specs_from_keras
+    engine = FusedInferenceEngine(fold_layers(layer_specs_from_keras(model)))
+    row = np.asarray(X[:1], dtype=np.float32)
+    engine.predict(row)
+    best = None
+    for _ in range(blocks):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            engine.predict(row)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / repeats * 1e6
+
+
+def _train_rung(task):
+    """Довчає одну конфігурацію до epochs_to і повертає метрики на валідації (виконується у воркері)"""
+    from tensorflow import keras
+    from sklearn.metrics import f1_score, precision_score, recall_score, roc_auc_score
+    from .model_training import IoTAnomalyDetector
+    config_id, config, work_dir, epochs_from, epochs_to = task
+    data = {name: np.load(os.path.join(work_dir, name + '.npy'), mmap_mode='r') for name in _DATA_FILES}
+    checkpoint = os.path.join(work_dir, f'config_{config_id:03d}.keras')
+
+    if epochs_from and os.path.exists(checkpoint):
+        model = keras.models.load_model(checkpoint)
+    else:
+        params = {key: value for key, value in config.items() if key != 'batch_size'}
+        model = IoTAnomalyDetector(data['X_train'].shape[1]).build_classifier_model(**params)
+    start = time.perf_counter()
+    history = model.fit(data['X_train'], data['y_train'], initial_epoch=epochs_from, epochs=epochs_to,
+                        batch_size=config['batch_size'], validation_data=(data['X_val'], data['y_val']), verbose=0)
+    train_seconds = time.perf_counter() - start
+    model.save(checkpoint)
+
+    y_val = np.asarray(data['y_val'])
+    scores = model.predict(data['X_val'], batch_size=4096, verbose=0).flatten()
+    y_pred = (scores > 0.5).astype(int)
+    return {
+        'config_id': config_id,
+        'epochs': epochs_to,
+        'val_loss': float(history.history['val_loss'][-1]),
+        'precision': float(precision_score(y_val, y_pred, zero_division=0)),
+        'recall': float(recall_score(y_val, y_pred, zero_division=0)),
+        'f1': float(f1_score(y_val, y_pred, zero_division=0)),
+        'roc_auc': float(roc_auc_score(y_val, scores)) if len(np.unique(y_val)) > 1 else None,
+        'latency_us': _single_flow_latency_us(model, data['X_val']),
+        'train_seconds': train_seconds,
+        'params': int(model.count_params())
+    }
+
+
+def _rank_key(value, metric):
+    # val_loss - менше краще, інші - більше краще; None (наприклад roc_auc на одному класі) - в кінець
+    if value is None:
+        return (True, 0.0)
+    return (False, value if metric == 'val_loss' else -value)
+
+
+def successive_halving(X, y, n_configs=27, min_epochs=1, max_epochs=27, eta=3, n_workers=None,
+                       space=None, seed=42, work_dir='models/search', metric='val_loss',
+                       model_path='models/anomaly_detector.h5', scaler_path='models/preprocessor.pkl',
+                       bundle_path='models/anomaly_detector.bundle'):
+    """Паралельний пошук гіперпараметрів build_classifier_model методом successive halving.
+
+    На кожному щаблі всі живі конфігурації довчаються (з checkpoint'ів) до бюджету щабля
+    у процесах-воркерах, далі лишається найкраща 1/eta частина за metric (val_loss - менше
+    краще, інші - більше краще). Найкраща модель зберігається через save_model і save_bundle.
+    Повертає (detector, leaderboard) - leaderboard також пишеться у work_dir/leaderboard.json.
+    """
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+    from .model_training import IoTAnomalyDetector
+    from .backends import ClassifierBackend
+
+    os.makedirs(work_dir, exist_ok=True)
+    feature_order = list(X.columns) if hasattr(X, 'columns') else None
+    y = np.asarray(y).ravel().astype(np.float32)
+    X_train, X_val, y_train, y_val = train_test_split(np.asarray(X, dtype=np.float32), y, test_size=0.2,
+                                                      stratify=y, random_state=seed)
+    # Scaler бачить лише навчальну частину, щоб статистики валідації не потрапляли в оцінки конфігурацій
+    scaler = StandardScaler().fit(X_train)
+    X_train = scaler.transform(X_train).astype(np.float32)
+    X_val = scaler.transform(X_val).astype(np.float32)
+    # Воркери відкривають дані через mmap замість пересилання копії в кожну задачу
+    for name, array in zip(_DATA_FILES, (X_train, y_train, X_val, y_val)):
+        np.save(os.path.join(work_dir, name + '.npy'), array)
+
+    configs = sample_configs(n_configs, space, seed)
+    budgets = rung_epochs(min_epochs, max_epochs, eta)
+    n_workers = min(n_workers or os.cpu_count() or 1, len(configs))
+    n_threads = max(1, (os.cpu_count() or 1) // n_workers)
+    print(f"🔎 Пошук: {len(configs)} конфігурацій, щаблі {budgets} епох, {n_workers} воркерів")
+
+    alive = list(range(len(configs)))
+    results = {}
+    previous = 0
+    # spawn: батьківський процес уже міг завантажити TensorFlow, fork з ним небезпечний
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=context,
+                             initializer=_init_worker, initargs=(n_threads,)) as pool:
+        for rung, budget in enumerate(budgets):
+            tasks = [(i, configs[i], work_dir, previous, budget) for i in alive]
+            for result in pool.map(_train_rung, tasks):
+                result['rung'] = rung
+                results[result['config_id']] = result
+            ranked = sorted(alive, key=lambda i: _rank_key(results[i][metric], metric))
+            best = results[ranked[0]]
+            best_value = 'n/a' if best[metric] is None else f"{best[metric]:.4f}"
+            print(f"   Щабель {rung + 1}/{len(budgets)} ({budget} епох): {len(alive)} конфігурацій, "
+                  f"найкраща #{best['config_id']} {metric}={best_value}")
+            alive = ranked[:max(1, len(ranked) // eta)] if rung < len(budgets) - 1 else ranked[:1]
+            previous = budget
+
+    rows = [dict(results[i], **{key: configs[i][key] for key in configs[i]}) for i in results]
+    leaderboard = pd.DataFrame(rows).sort_values(['rung', metric], ascending=[False, metric == 'val_loss'])
+    leaderboard = leaderboard.reset_index(drop=True)
+    with open(os.path.join(work_dir, 'leaderboard.json'), 'w') as f:
+        json.dump(leaderboard.to_dict(orient='records'), f, indent=2, default=list)
+
+    from tensorflow import keras
+    best_id = alive[0]
+    detector = IoTAnomalyDetector(input_dim=X_train.shape[1])
+    detector.scaler = scaler
+    detector._use_backend(ClassifierBackend(keras.models.load_model(os.path.join(work_dir, f'config_{best_id:03d}.keras'))))
+    detector.save_model(model_path, scaler_path)
+    if bundle_path:
+        detector.save_bundle(bundle_path, feature_order=feature_order)
+    print(f"🏆 Найкраща конфігурація #{best_id}: {configs[best_id]}")
+    return detector, leaderboard
+
+
+if __name__ == '__main__':
+    from .data_loader import IoTDataLoader
+    parser = argparse.ArgumentParser(description="Пошук гіперпараметрів детектора (successive halving)")
+    parser.add_argument('--data', default='data/synthetic_iot_dataset.csv')
+    parser.add_argument('--configs', type=int, default=27)
+    parser.add_argument('--min-epochs', type=int, default=1)
+    parser.add_argument('--max-epochs', type=int, default=27)
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    loader = IoTDataLoader(args.data)
+    loader.load_data()
+    X, y, _ = loader.prepare_features()
+    _, board = successive_halving(X, y, args.configs, args.min_epochs, args.max_epochs, args.eta, args.workers)
+    columns = ['config_id', 'rung', 'epochs', 'val_loss', 'f1', 'roc_auc', 'latency_us', 'hidden_units',
+               'dropout_rates', 'head_units', 'learning_rate', 'batch_size']
+    print(board[columns].head(10).to_string(index=False))
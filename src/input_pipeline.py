@@ -0,0 +1,82 @@
+import hashlib
+import os
+import numpy as np
+import tensorflow as tf
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def hash_split_mask(row_ids, validation_fraction, seed=42):
+    """Детермінований поділ train/validation за хешем номера рядка (splitmix64).
+    Рядок завжди потрапляє в ту саму частину, незалежно від розміру чанків і порядку читання"""
+    with np.errstate(over='ignore'):
+        x = np.asarray(row_ids, dtype=np.uint64) + np.uint64(seed) * _GOLDEN
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        x = x ^ (x >> np.uint64(31))
+    return (x >> np.uint64(11)).astype(np.float64) * 2.0 ** -53 < validation_fraction
+
+
+def fit_scaler_streaming(scaler, batch_source):
+    # Перший прохід: StandardScaler.partial_fit по чанках замість fit_transform на всьому X
+    for X, _ in batch_source():
+        scaler.partial_fit(X)
+    return scaler
+
+
+def _source_signature(batch_source):
+    # Для IoTDataLoader - шляхи, розміри і mtime файлів; для довільної функції - лише її ім'я
+    loader = getattr(batch_source, '__self__', None)
+    if loader is not None and hasattr(loader, 'resolve_sources'):
+        parts = []
+        for path in loader.resolve_sources():
+            st = os.stat(path)
+            parts.append(f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}")
+        return ';'.join(parts)
+    return getattr(batch_source, '__qualname__', repr(batch_source))
+
+
+def cache_path(cache, batch_source, mean, scale, subset, validation_fraction, seed):
+    """Файл tf.data-кешу, прив'язаний до scaler, джерела і поділу: після нового scaler
+    або зміни файлів береться інший файл, а не застарілі масштабовані ознаки"""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(np.ascontiguousarray(mean).data)
+    h.update(np.ascontiguousarray(scale).data)
+    h.update(f"{_source_signature(batch_source)}|{subset}|{validation_fraction}|{seed}".encode())
+    return f"{cache}-{h.hexdigest()}"
+
+
+def make_dataset(batch_source, scaler, subset='train', validation_fraction=0.2, batch_size=128,
+                 shuffle_buffer=100_000, cache=None, seed=42):
+    """tf.data конвеєр поверх джерела чанків (X, y).
+
+    batch_source - функція, що щоразу повертає новий ітератор чанків (наприклад
+    loader.iter_feature_batches). cache: None - без кешу, '' - у пам'яті, шлях - префікс файлу
+    на диску (до нього додається ключ scaler і джерела, див. cache_path).
+    """
+    mean = scaler.mean_.astype(np.float32)
+    scale = scaler.scale_.astype(np.float32)
+    input_dim = len(mean)
+
+    def generator():
+        offset = 0
+        for X, y in batch_source():
+            if y is None:
+                raise ValueError("Для навчання потрібні лейбли y")
+            is_val = hash_split_mask(np.arange(offset, offset + len(X)), validation_fraction, seed)
+            offset += len(X)
+            keep = is_val if subset == 'validation' else ~is_val
+            yield ((X[keep] - mean) / scale).astype(np.float32), y[keep].astype(np.float32)
+
+    ds = tf.data.Dataset.from_generator(generator, output_signature=(
+        tf.TensorSpec(shape=(None, input_dim), dtype=tf.float32),
+        tf.TensorSpec(shape=(None,), dtype=tf.float32)
+    ))
+    ds = ds.unbatch()
+    if cache:
+        ds = ds.cache(cache_path(cache, batch_source, mean, scale, subset, validation_fraction, seed))
+    elif cache is not None:
+        ds = ds.cache(cache)
+    if subset == 'train' and shuffle_buffer:
+        ds = ds.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    return ds.batch(batch_size).prefetch(tf.data.AUTOTUNE)
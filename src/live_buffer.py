@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+from .simulator import FEATURE_COLUMNS, INTEGER_COLUMNS, TRAFFIC_LABELS
+
+
+class LiveTrafficBuffer:
+    """Кільцевий колонковий буфер останніх capacity потоків для Live Demo.
+
+    Пам'ять виділяється один раз; append пише батч на місце найстаріших рядків, tail(n)
+    копіює лише n рядків. Лічильники за мітками та виявленими атаками оновлюються
+    інкрементально і покривають усю сесію, тож метрики не залежать від довжини історії.
+    """
+
+    def __init__(self, capacity=1000, columns=None):
+        self.capacity = capacity
+        self.columns = list(columns or FEATURE_COLUMNS)
+        self.labels = list(TRAFFIC_LABELS.values())
+        self.devices = []
+        self.timestamp = np.empty(capacity, dtype='datetime64[us]')
+        self.device = np.empty(capacity, dtype=np.int16)
+        self.label = np.empty(capacity, dtype=np.int16)
+        self.features = {c: np.empty(capacity, dtype=np.int64 if c in INTEGER_COLUMNS else np.float64)
+                         for c in self.columns}
+        self.score = np.empty(capacity, dtype=np.float32)
+        self.anomaly = np.empty(capacity, dtype=bool)
+        self.clear()
+
+    def clear(self):
+        self.total = 0
+        self.label_counts = np.zeros(len(self.labels), dtype=np.int64)
+        self.detected_counts = np.zeros(len(self.labels), dtype=np.int64)
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def _codes(self, values, categories):
+        # Коди батчу перекладаються у коди буфера; нові категорії (пристрої, мітки) додаються на льоту
+        if not isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype('category')
+        mapping = []
+        for value in values.cat.categories:
+            if value not in categories:
+                categories.append(value)
+            mapping.append(categories.index(value))
+        return np.asarray(mapping, dtype=np.int16)[values.cat.codes.to_numpy()]
+
+    def append(self, frame, anomalies=None, scores=None):
+        n = len(frame)
+        if n == 0:
+            return
+        label_codes = self._codes(frame['label'], self.labels)
+        if len(self.labels) > len(self.label_counts):
+            grow = len(self.labels) - len(self.label_counts)
+            self.label_counts = np.concatenate([self.label_counts, np.zeros(grow, dtype=np.int64)])
+            self.detected_counts = np.concatenate([self.detected_counts, np.zeros(grow, dtype=np.int64)])
+        anomalies = np.zeros(n, dtype=bool) if anomalies is None else np.asarray(anomalies, dtype=bool)
+        scores = np.zeros(n, dtype=np.float32) if scores is None else np.asarray(scores, dtype=np.float32)
+        self.label_counts += np.bincount(label_codes, minlength=len(self.labels))
+        self.detected_counts += np.bincount(label_codes[anomalies], minlength=len(self.labels))
+
+        # У кільце потрапляють лише останні capacity рядків батчу
+        keep = slice(max(0, n - self.capacity), n)
+        positions = (self.total + np.arange(keep.start, keep.stop)) % self.capacity
+        self.timestamp[positions] = frame['timestamp'].to_numpy()[keep]
+        self.device[positions] = self._codes(frame['device'], self.devices)[keep]
+        self.label[positions] = label_codes[keep]
+        for c in self.columns:
+            self.features[c][positions] = frame[c].to_numpy()[keep]
+        self.score[positions] = scores[keep]
+        self.anomaly[positions] = anomalies[keep]
+        self.total += n
+
+    def _column(self, name, positions):
+        if name == 'device':
+            return np.asarray(self.devices, dtype=object)[self.device[positions]]
+        if name == 'label':
+            return np.asarray(self.labels, dtype=object)[self.label[positions]]
+        if name in self.features:
+            return self.features[name][positions]
+        return getattr(self, name)[positions]
+
+    def tail(self, n=10, columns=None):
+        """Останні n потоків у хронологічному порядку як DataFrame (лише потрібні колонки)"""
+        n = min(n, len(self))
+        positions = (self.total - n + np.arange(n)) % self.capacity
+        columns = columns or ['timestamp', 'device', 'label'] + self.columns + ['score', 'anomaly']
+        return pd.DataFrame({c: self._column(c, positions) for c in columns})
+
+    def label_distribution(self):
+        """{мітка: кількість} за всю сесію, за спаданням (аналог value_counts по всій історії)"""
+        order = np.argsort(-self.label_counts, kind='stable')
+        return {self.labels[i]: int(self.label_counts[i]) for i in order if self.label_counts[i] > 0}
+
+    def attacks_detected(self):
+        # Виявлені потоки з реальною міткою атаки (як алерти з типом, відмінним від Benign)
+        benign = self.labels.index('Benign')
+        return int(self.detected_counts.sum() - self.detected_counts[benign])
+
+    def threat_rate(self):
+        return self.attacks_detected() / self.total if self.total else 0.0
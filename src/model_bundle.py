@@ -0,0 +1,154 @@
+import datetime
+import json
+import os
+import pickle
+import struct
+import zlib
+import numpy as np
+from .fast_inference import FusedInferenceEngine, fold_layers, layer_specs_from_keras
+
+SCHEMA_VERSION = 1
+MAGIC = b'IOTBNDL\0'
+# Масиви вирівнюються на 64 байти, щоб mmap-view були вирівняні для SIMD
+ALIGNMENT = 64
+_PREFIX = struct.Struct('<8sQ')
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def save_bundle(path, arrays, meta):
+    """Один файл: MAGIC, довжина і JSON-заголовок (meta + опис масивів), далі сирі масиви.
+
+    Кожен масив має dtype, shape, зсув і crc32 у заголовку; запис атомарний через .tmp.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    entries, offset = {}, 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        entries[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset,
+                         'nbytes': int(array.nbytes), 'crc32': zlib.crc32(array.data)}
+        offset += array.nbytes
+    header = dict(meta, schema_version=SCHEMA_VERSION, arrays=entries)
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    data_start = _align(_PREFIX.size + len(header_bytes))
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + entries[name]['offset'])
+            f.write(array.data)
+        f.truncate(data_start + offset)
+    os.replace(path + '.tmp', path)
+
+
+def load_bundle(path, verify=True):
+    """Повертає (arrays, meta); масиви - read-only view одного np.memmap файлу, без копіювання"""
+    with open(path, 'rb') as f:
+        magic, header_len = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} не є бандлом моделі")
+        meta = json.loads(f.read(header_len).decode('utf-8'))
+    if meta.get('schema_version', 0) > SCHEMA_VERSION:
+        raise ValueError(f"Бандл має схему v{meta['schema_version']}, підтримується до v{SCHEMA_VERSION}")
+
+    data_start = _align(_PREFIX.size + header_len)
+    buffer = np.memmap(path, dtype=np.uint8, mode='r')
+    arrays = {}
+    for name, entry in meta.pop('arrays').items():
+        start = data_start + entry['offset']
+        raw = buffer[start:start + entry['nbytes']]
+        if len(raw) != entry['nbytes']:
+            raise ValueError(f"Бандл {path} обрізаний: масив {name} неповний")
+        if verify and zlib.crc32(raw) != entry['crc32']:
+            raise ValueError(f"Бандл {path} пошкоджений: не збігається crc32 масиву {name}")
+        arrays[name] = raw.view(np.dtype(entry['dtype'])).reshape(entry['shape'])
+    return arrays, meta
+
+
+def save_detector(detector, path, feature_order=None, metrics=None):
+    """Зберігає IoTAnomalyDetector у бандл: scaler, ваги Keras (для донавчання) і
+    згорнуті fused-стадії (для інференсу без TensorFlow) або модель sklearn"""
+    scaler = detector.scaler
+    if feature_order is None:
+        feature_order = getattr(scaler, 'feature_names_in_', None)
+    arrays = {'scaler_mean': scaler.mean_.astype(np.float64), 'scaler_scale': scaler.scale_.astype(np.float64),
+              'scaler_var': scaler.var_.astype(np.float64)}
+    meta = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'model_type': detector.model_type,
+        'threshold': float(detector.threshold),
+        'feature_order': None if feature_order is None else [str(name) for name in feature_order],
+        'metrics': metrics or {},
+        'scaler_samples': int(np.max(scaler.n_samples_seen_))
+    }
+    if detector.model_type == 'tree':
+        arrays['sklearn_model'] = np.frombuffer(pickle.dumps(detector.model), dtype=np.uint8)
+    else:
+        # Автоенкодер порівнює реконструкцію з масштабованим входом, тому scaler не згортається
+        fold_scaler = detector.model_type == 'classifier'
+        stages = fold_layers(layer_specs_from_keras(detector.model),
+                             scaler.mean_ if fold_scaler else None, scaler.scale_ if fold_scaler else None)
+        for i, (W, b, _) in enumerate(stages):
+            arrays[f'W{i}'] = W
+            arrays[f'b{i}'] = b
+        meta['activations'] = [activation for _, _, activation in stages]
+        meta['scaler_folded'] = fold_scaler
+        weights = detector.model.get_weights()
+        for i, w in enumerate(weights):
+            arrays[f'keras_{i}'] = w
+        meta['keras_weights'] = len(weights)
+        meta['keras_config'] = detector.model.to_json()
+    save_bundle(path, arrays, meta)
+
+
+class BundleDetector:
+    """Детектор з бандла без TensorFlow: той самий контракт detect_anomalies.
+
+    Приймає numpy-масив (ознаки у feature_order) або DataFrame (колонки впорядковуються
+    за feature_order).
+    """
+
+    def __init__(self, arrays, meta):
+        self.arrays = arrays
+        self.meta = meta
+        self.model_type = meta['model_type']
+        self.threshold = meta['threshold']
+        self.feature_order = meta.get('feature_order')
+        self.metrics = meta.get('metrics', {})
+        self.mean = arrays['scaler_mean']
+        self.scale = arrays['scaler_scale']
+        if self.model_type == 'tree':
+            self.model = pickle.loads(arrays['sklearn_model'].tobytes())
+            self.engine = None
+        else:
+            stages = [(arrays[f'W{i}'], arrays[f'b{i}'], a) for i, a in enumerate(meta['activations'])]
+            self.engine = FusedInferenceEngine(stages, self.threshold)
+
+    @classmethod
+    def load(cls, path, verify=True):
+        return cls(*load_bundle(path, verify))
+
+    def _as_matrix(self, X):
+        if hasattr(X, 'columns') and self.feature_order:
+            X = X[self.feature_order]
+        return np.asarray(X, dtype=np.float32)
+
+    def predict(self, X):
+        X = self._as_matrix(X)
+        if self.meta.get('scaler_folded'):
+            return self.engine.predict(X)
+        X_scaled = ((X - self.mean) / self.scale).astype(np.float32)
+        if self.model_type == 'tree':
+            return self.model.predict_proba(X_scaled)[:, 1]
+        reconstruction = self.engine.predict(X_scaled)
+        return np.mean(np.square(X_scaled - reconstruction), axis=1)
+
+    def detect_anomalies(self, X, threshold=None):
+        anomaly_scores = self.predict(X)
+        if threshold is None:
+            threshold = self.threshold
+        return anomaly_scores > threshold, anomaly_scores, threshold
@@ -0,0 +1,201 @@
+import datetime
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .model_bundle import BundleDetector, load_bundle
+
+MANIFEST = 'registry.json'
+
+
+class ShadowStats:
+    """Порівняння кандидата з активною моделлю на живому трафіку"""
+
+    def __init__(self):
+        self.flows = 0
+        self.agreements = 0
+        self.active_anomalies = 0
+        self.candidate_anomalies = 0
+        self.max_score_diff = 0.0
+        self.skipped = 0
+
+    def update(self, active_result, candidate_result):
+        active_flags, active_scores, _ = active_result
+        candidate_flags, candidate_scores, _ = candidate_result
+        self.flows += len(active_flags)
+        self.agreements += int(np.sum(active_flags == candidate_flags))
+        self.active_anomalies += int(np.sum(active_flags))
+        self.candidate_anomalies += int(np.sum(candidate_flags))
+        if len(active_scores):
+            self.max_score_diff = max(self.max_score_diff, float(np.max(np.abs(active_scores - candidate_scores))))
+
+    def summary(self):
+        return {
+            'flows': self.flows,
+            'agreement': self.agreements / self.flows if self.flows else None,
+            'active_anomalies': self.active_anomalies,
+            'candidate_anomalies': self.candidate_anomalies,
+            'max_score_diff': self.max_score_diff,
+            'skipped_batches': self.skipped
+        }
+
+
+class ModelRegistry:
+    """Реєстр версій моделі (бандлів) з гарячою заміною.
+
+    register() копіює бандл у registry_dir як нову версію. stage() завантажує і прогріває
+    кандидата у фоновому потоці; з shadow=True кандидат паралельно оцінює той самий трафік
+    (результат не повертається клієнтам, лише статистика). promote() атомарно підміняє
+    активну модель: детекції, що вже почались, завершуються на старій версії, бо тримають
+    посилання на неї. rollback() повертає попередню версію (вона лишається в пам'яті).
+    Сам реєстр має контракт detect_anomalies, тож його можна передати в
+    MicroBatchDetectionService замість детектора.
+    """
+
+    def __init__(self, registry_dir='models/registry', loader=BundleDetector.load, warmup_rows=256, keep_previous=2,
+                 max_shadow_pending=64):
+        self.registry_dir = registry_dir
+        self.loader = loader
+        self.warmup_rows = warmup_rows
+        # Скільки попередніх версій тримати в пам'яті для миттєвого відкату
+        self.keep_previous = keep_previous
+        os.makedirs(registry_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._active = None
+        self._candidate = None
+        self._previous = []
+        self._shadow = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        # Shadow-оцінювання не повинно накопичувати необмежену чергу: зайві батчі пропускаються
+        self._shadow_slots = threading.Semaphore(max_shadow_pending)
+        manifest = self._read_manifest()
+        if manifest['active'] is not None:
+            self._active = (manifest['active'], self._load(manifest['active']))
+
+    def _manifest_path(self):
+        return os.path.join(self.registry_dir, MANIFEST)
+
+    def _read_manifest(self):
+        if not os.path.exists(self._manifest_path()):
+            return {'versions': [], 'active': None}
+        with open(self._manifest_path()) as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest):
+        tmp = self._manifest_path() + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self._manifest_path())
+
+    def versions(self):
+        return self._read_manifest()['versions']
+
+    def artifact_path(self, version):
+        return os.path.join(self.registry_dir, f'v{version:04d}.bundle')
+
+    def register(self, bundle_path, note=''):
+        # Перевіряємо цілісність до копіювання: у реєстр не потрапляють пошкоджені артефакти
+        _, meta = load_bundle(bundle_path)
+        with self._lock:
+            manifest = self._read_manifest()
+            version = max([v['version'] for v in manifest['versions']], default=0) + 1
+            path = self.artifact_path(version)
+            shutil.copyfile(bundle_path, path + '.tmp')
+            os.replace(path + '.tmp', path)
+            manifest['versions'].append({
+                'version': version,
+                'registered': datetime.datetime.now().isoformat(timespec='seconds'),
+                'source': os.path.abspath(bundle_path),
+                'model_type': meta['model_type'],
+                'metrics': meta.get('metrics', {}),
+                'note': note
+            })
+            self._write_manifest(manifest)
+        print(f"📦 Зареєстровано модель v{version}")
+        return version
+
+    def _load(self, version):
+        detector = self.loader(self.artifact_path(version))
+        # Прогрів: перший виклик не повинен припадати на живий запит
+        n_features = len(getattr(detector, 'feature_order', None) or []) or 8
+        detector.detect_anomalies(np.zeros((self.warmup_rows, n_features), dtype=np.float32))
+        return detector
+
+    @property
+    def active_version(self):
+        active = self._active
+        return None if active is None else active[0]
+
+    @property
+    def active_detector(self):
+        active = self._active
+        return None if active is None else active[1]
+
+    def stage(self, version, shadow=False):
+        """Завантажує кандидата у фоні; повертає Future, що завершиться після прогріву"""
+        def load():
+            detector = self._load(version)
+            with self._lock:
+                self._candidate = (version, detector)
+                self._shadow = ShadowStats() if shadow else None
+            print(f"🔥 Модель v{version} завантажено і прогріто")
+            return version
+        return self._executor.submit(load)
+
+    def shadow_stats(self):
+        shadow = self._shadow
+        return None if shadow is None else shadow.summary()
+
+    def promote(self, version=None):
+        """Атомарна заміна активної моделі на кандидата (або версію з реєстру, якщо її не підготовано)"""
+        if version is not None and (self._candidate is None or self._candidate[0] != version):
+            self.stage(version).result()
+        with self._lock:
+            if self._candidate is None:
+                raise ValueError("Немає підготовленого кандидата: спочатку викличте stage()")
+            if self._active is not None:
+                self._previous = (self._previous + [self._active])[-self.keep_previous:]
+            self._active, self._candidate, self._shadow = self._candidate, None, None
+            self._set_active(self._active[0])
+        print(f"✅ Активна модель: v{self._active[0]}")
+        return self._active[0]
+
+    def rollback(self):
+        """Повертає попередню активну версію одним викликом, без повторного завантаження"""
+        with self._lock:
+            if not self._previous:
+                raise ValueError("Немає попередньої версії для відкату")
+            self._active = self._previous.pop()
+            self._set_active(self._active[0])
+        print(f"↩️ Відкат до моделі v{self._active[0]}")
+        return self._active[0]
+
+    def _set_active(self, version):
+        manifest = self._read_manifest()
+        manifest['active'] = version
+        self._write_manifest(manifest)
+
+    def detect_anomalies(self, X, threshold=None):
+        # Одне читання атрибуту: заміна під час виклику не змінює модель цього запиту
+        active, candidate, shadow = self._active, self._candidate, self._shadow
+        if active is None:
+            raise ValueError("У реєстрі немає активної моделі")
+        result = active[1].detect_anomalies(X, threshold)
+        if shadow is not None and candidate is not None:
+            # Кандидат оцінює трафік у фоновому потоці, відповідь клієнту не чекає на нього
+            if self._shadow_slots.acquire(blocking=False):
+                self._executor.submit(self._score_shadow, shadow, candidate[1], X, result)
+            else:
+                shadow.skipped += 1
+        return result
+
+    def _score_shadow(self, shadow, detector, X, active_result):
+        try:
+            shadow.update(active_result, detector.detect_anomalies(X))
+        finally:
+            self._shadow_slots.release()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
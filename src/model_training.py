@@ -1,95 +1,286 @@
-import tensorflow as tf
-from tensorflow import keras
-from tensorflow.keras import layers
-from tensorflow.keras import metrics as keras_metrics
+# TensorFlow і sklearn імпортуються лише всередині методів, що їх використовують:
+# імпорт цього модуля (dashboard, воркери) не повинен тягнути TF (~5 с) і scipy (~1.5 с)
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import classification_report
 import joblib
 import json
+import os
+from .backends import ClassifierBackend, get_backend
+from .replay_buffer import ReplayBuffer
 
 class IoTAnomalyDetector:
     def __init__(self, input_dim):
+        from sklearn.preprocessing import StandardScaler
         self.input_dim = input_dim
         self.model = None
         self.scaler = StandardScaler()
         self.history = None
+        self.replay = None
+        self.model_type = 'classifier'
+        self.backend = None
+        self.threshold = 0.5
         
-    def build_classifier_model(self):
-        model = keras.Sequential([
-            layers.Input(shape=(self.input_dim,)),
-            layers.Dense(128, activation='relu'),
-            layers.BatchNormalization(),
-            layers.Dropout(0.3),
-            layers.Dense(64, activation='relu'),
-            layers.BatchNormalization(),
-            layers.Dropout(0.3),
-            layers.Dense(32, activation='relu'),
-            layers.BatchNormalization(),
-            layers.Dropout(0.2),
-            layers.Dense(16, activation='relu'),
-            layers.Dense(1, activation='sigmoid')
-        ])
-        
-        # ВИПРАВЛЕНО: використовуємо класи метрик замість рядків
-        model.compile(
-            optimizer='adam', 
-            loss='binary_crossentropy', 
-            metrics=[
-                'accuracy',
-                keras_metrics.Precision(name='precision'),
-                keras_metrics.Recall(name='recall')
+    def build_classifier_model(self, hidden_units=(128, 64, 32), dropout_rates=(0.3, 0.3, 0.2),
+                               head_units=16, learning_rate=0.001):
+        # dropout_rates - по одному на кожен шар hidden_units або одне число для всіх
+        from tensorflow import keras
+        from tensorflow.keras import layers
+        if np.isscalar(dropout_rates):
+            dropout_rates = [dropout_rates] * len(hidden_units)
+        model_layers = [layers.Input(shape=(self.input_dim,))]
+        for units, rate in zip(hidden_units, dropout_rates):
+            model_layers += [
+                layers.Dense(units, activation='relu'),
+                layers.BatchNormalization(),
+                layers.Dropout(rate)
             ]
-        )
+        if head_units:
+            model_layers.append(layers.Dense(head_units, activation='relu'))
+        model_layers.append(layers.Dense(1, activation='sigmoid'))
+        model = ClassifierBackend.compile(keras.Sequential(model_layers), learning_rate)
         
-        self.model = model
+        self._use_backend(ClassifierBackend(model))
         print("✅ Модель створено")
         return model
     
-    def train(self, X, y=None, epochs=50, batch_size=128, validation_split=0.2, model_type='classifier'):
+    def _use_backend(self, backend):
+        self.backend = backend
+        self.model = backend.model
+        self.model_type = backend.name
+        self.threshold = backend.threshold
+    
+    def train(self, X, y=None, epochs=50, batch_size=128, validation_split=0.2, model_type='classifier',
+              model_params=None):
+        # model_type: 'classifier' (MLP), 'autoencoder' (без лейблів), 'tree' (ансамбль дерев);
+        # model_params передаються в конструктор моделі (напр. build_classifier_model)
+        from sklearn.metrics import classification_report
+        from sklearn.model_selection import train_test_split
+        backend_class = get_backend(model_type)
+        if y is None and backend_class.requires_labels:
+            raise ValueError(f"Для {model_type} потрібні лейбли y")
         X_scaled = self.scaler.fit_transform(X)
+        
+        backend = backend_class.create(self, **(model_params or {}))
         if y is None:
-            raise ValueError("Для classifier потрібні лейбли y")
+            X_train, X_test = train_test_split(X_scaled, test_size=validation_split, random_state=42)
+            y_train = y_test = None
+        else:
+            X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=validation_split, random_state=42)
         
-        self.build_classifier_model()
-        X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
+        self.history = backend.fit(X_train, y_train, X_test, y_test, epochs=epochs, batch_size=batch_size)
+        self._use_backend(backend)
         
-        self.history = self.model.fit(
-            X_train, y_train, 
-            epochs=epochs, 
-            batch_size=batch_size,
-            validation_data=(X_test, y_test), 
-            verbose=1
-        )
+        if y is None:
+            print(f"\n📊 Поріг аномалії: {self.threshold:.4f}")
+            return self.history, (X_test, y_test)
+        
+        # Частина навчальних даних лишається в буфері для partial_fit (захист від забування)
+        self.replay = ReplayBuffer(input_dim=self.input_dim)
+        self.replay.add(np.asarray(X, dtype=np.float32), np.asarray(y))
         
-        y_pred = (self.model.predict(X_test, verbose=0) > 0.5).astype(int)
+        y_pred = (backend.score(X_test) > self.threshold).astype(int)
         print("\n📊 Результати:")
         print(classification_report(y_test, y_pred, target_names=['Benign', 'Malicious']))
         return self.history, (X_test, y_test)
     
+    def train_budgeted(self, X, y, max_epochs=100, max_seconds=None, batch_size=128, patience=5,
+                       lr_patience=2, checkpoint_dir='models/checkpoints', checkpoint_every=1, resume=True):
+        # Навчання з бюджетом (епохи / секунди), early stopping, зменшенням LR на плато
+        # та checkpoint'ами; перерване навчання продовжується з останньої збереженої епохи
+        from tensorflow import keras
+        from sklearn.model_selection import train_test_split
+        from sklearn.preprocessing import StandardScaler
+        from .training_callbacks import (ResumableEarlyStopping, TimeBudget, TrainingCheckpoint, fingerprint,
+                                         load_checkpoint)
+        if y is None:
+            raise ValueError("Для classifier потрібні лейбли y")
+
+        data_fingerprint = fingerprint(np.asarray(X, dtype=np.float32), np.asarray(y).ravel())
+        checkpoint = load_checkpoint(checkpoint_dir) if resume else None
+        if checkpoint is not None:
+            model, self.scaler, state = checkpoint
+            # Checkpoint іншого запуску (інші дані або підмінений scaler) продовжувати не можна
+            if state.get('data_fingerprint') != data_fingerprint:
+                raise ValueError(f"Checkpoint у {checkpoint_dir} створено на інших даних: "
+                                 "передайте resume=False або інший checkpoint_dir")
+            if state.get('scaler_fingerprint') != fingerprint(self.scaler.mean_, self.scaler.scale_):
+                raise ValueError(f"Scaler у {checkpoint_dir} не відповідає checkpoint'у: передайте resume=False")
+            self._use_backend(ClassifierBackend(model))
+            initial_epoch, past_history = state['epoch'], state['history']
+            early_state, best_weights = state.get('early_stopping'), state.get('best_weights')
+            print(f"🔁 Продовження навчання з епохи {initial_epoch}")
+            X_scaled = self.scaler.transform(X)
+        else:
+            self.scaler = StandardScaler()
+            X_scaled = self.scaler.fit_transform(X)
+            self.build_classifier_model()
+            initial_epoch, past_history = 0, {}
+            early_state = best_weights = None
+
+        # random_state фіксований, тому після відновлення розбиття те саме
+        X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
+        early_stopping = ResumableEarlyStopping(early_state, best_weights, monitor='val_loss', patience=patience,
+                                                restore_best_weights=True)
+        fingerprints = {'data_fingerprint': data_fingerprint,
+                        'scaler_fingerprint': fingerprint(self.scaler.mean_, self.scaler.scale_)}
+        saver = TrainingCheckpoint(checkpoint_dir, self.scaler, every=checkpoint_every, history=past_history,
+                                   early_stopping=early_stopping, fingerprints=fingerprints)
+        callbacks = [
+            early_stopping,
+            keras.callbacks.ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=lr_patience, min_lr=1e-5),
+            saver
+        ]
+        if max_seconds:
+            callbacks.append(TimeBudget(max_seconds))
+
+        self.history = self.model.fit(
+            X_train, y_train,
+            epochs=max_epochs,
+            initial_epoch=initial_epoch,
+            batch_size=batch_size,
+            validation_data=(X_test, y_test),
+            callbacks=callbacks,
+            verbose=1
+        )
+        # Історія включає епохи з попередніх (перерваних) запусків
+        self.history.history = saver.history
+        # Зупинка за бюджетом часу не завершує навчання (наступний виклик продовжить його),
+        # якщо тільки вона не припала на останню епоху
+        final_epoch = initial_epoch + len(self.history.epoch)
+        budget_exhausted = bool(max_seconds) and callbacks[-1].stopped_epoch is not None
+        saver.save(final_epoch, completed=not budget_exhausted or final_epoch >= max_epochs)
+        return self.history, (X_test, y_test)
+
+    def train_streaming(self, source, epochs=10, batch_size=128, validation_fraction=0.2,
+                        shuffle_buffer=100_000, cache=None, seed=42):
+        # Навчання на даних, більших за пам'ять: source - IoTDataLoader або функція-ітератор чанків (X, y)
+        from sklearn.preprocessing import StandardScaler
+        from .input_pipeline import fit_scaler_streaming, make_dataset
+        batch_source = source.iter_feature_batches if hasattr(source, 'iter_feature_batches') else source
+        self.scaler = fit_scaler_streaming(StandardScaler(), batch_source)
+        self.build_classifier_model()
+
+        options = dict(validation_fraction=validation_fraction, batch_size=batch_size, seed=seed)
+        train_ds = make_dataset(batch_source, self.scaler, 'train', shuffle_buffer=shuffle_buffer,
+                                cache=cache, **options)
+        # Файл кешу включає subset і ключ scaler, тож train і validation не перетинаються
+        val_ds = make_dataset(batch_source, self.scaler, 'validation', cache=cache, **options)
+
+        self.history = self.model.fit(train_ds, epochs=epochs, validation_data=val_ds, verbose=1)
+        return self.history
+
+    def partial_fit(self, X, y, steps=1, replay_ratio=1.0, update_scaler=True, replay_capacity=10_000):
+        # Інкрементальне оновлення на новому батчі живого трафіку без повного перенавчання:
+        # оновлення статистик scaler + кілька кроків градієнта на суміші нових і старих прикладів
+        if self.model is not None and self.model_type != 'classifier':
+            raise ValueError("partial_fit підтримується лише для classifier")
+        if update_scaler:
+            self.scaler.partial_fit(X)
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y, dtype=np.float32).ravel()
+        if self.model is None:
+            self.build_classifier_model()
+        if self.replay is None:
+            self.replay = ReplayBuffer(capacity=replay_capacity, input_dim=X.shape[1])
+
+        X_old, y_old = self.replay.sample(int(len(X) * replay_ratio))
+        X_mix = (np.concatenate([X, X_old]) - self.scaler.mean_) / self.scaler.scale_
+        y_mix = np.concatenate([y, y_old])
+        for _ in range(steps):
+            result = self.model.train_on_batch(X_mix, y_mix)
+        self.replay.add(X, y)
+        return result
+
     def detect_anomalies(self, X, threshold=None):
         X_scaled = self.scaler.transform(X)
-        predictions = self.model.predict(X_scaled, verbose=0)
-        anomaly_scores = predictions.flatten()
+        anomaly_scores = self.backend.score(X_scaled)
         if threshold is None:
-            threshold = 0.5
-        anomalies = (predictions > threshold).flatten()
+            threshold = self.threshold
+        anomalies = anomaly_scores > threshold
         return anomalies, anomaly_scores, threshold
     
+    def export_fused(self, path=None, threshold=0.5):
+        # NumPy-рушій з вбудованими scaler і BatchNormalization; працює без TensorFlow
+        from .fast_inference import FusedInferenceEngine
+        if self.model_type != 'classifier':
+            raise ValueError("Fused-рушій підтримує лише classifier")
+        engine = FusedInferenceEngine.from_detector(self, threshold)
+        if path:
+            engine.save(path)
+        return engine
+    
+    def quantize_int8(self, X_calibration, X_holdout, y_holdout, output_dir='models', n_calibration=500):
+        # INT8 TFLite-артефакт для IoT-шлюзів + звіт (розмір, затримка, accuracy/recall)
+        from .quantization import quantization_report
+        if self.model_type != 'classifier':
+            raise ValueError("INT8-квантизація підтримує лише classifier")
+        return quantization_report(self, X_calibration, X_holdout, y_holdout, output_dir, n_calibration)
+    
+    def training_metrics(self):
+        if not self.history:
+            return {}
+        return {
+            'final_loss': float(self.history.history['loss'][-1]),
+            'final_val_loss': float(self.history.history.get('val_loss', [0])[-1])
+        }
+    
     def save_model(self, model_path='models/anomaly_detector.h5', scaler_path='models/preprocessor.pkl'):
-        self.model.save(model_path)
+        self.backend.save(model_path)
         joblib.dump(self.scaler, scaler_path)
+        # Тип backend'а і поріг потрібні, щоб load_model відновив той самий детектор
+        with open(self._backend_info_path(model_path), 'w') as f:
+            json.dump({'model_type': self.model_type, 'threshold': float(self.threshold)}, f, indent=2)
         if self.history:
-            metrics = {
-                'final_loss': float(self.history.history['loss'][-1]),
-                'final_val_loss': float(self.history.history.get('val_loss', [0])[-1])
-            }
-            with open('models/model_metrics.json', 'w') as f:
-                json.dump(metrics, f, indent=2)
+            # Метрики поруч з моделлю, а не завжди в models/
+            metrics_path = os.path.join(os.path.dirname(model_path), 'model_metrics.json')
+            with open(metrics_path, 'w') as f:
+                json.dump(self.training_metrics(), f, indent=2)
         print(f"✅ Модель збережено")
     
+    def save_bundle(self, path='models/anomaly_detector.bundle', feature_order=None, metrics=None):
+        # Один версійований файл: ваги, scaler, порядок ознак, поріг, метрики
+        from .model_bundle import save_detector
+        save_detector(self, path, feature_order, dict(self.training_metrics(), **(metrics or {})))
+        print(f"✅ Бандл моделі збережено: {path}")
+    
+    def load_bundle(self, path='models/anomaly_detector.bundle', verify=True):
+        # Відновлює Keras-модель (для донавчання); для швидкого інференсу - BundleDetector.load
+        from .model_bundle import load_bundle
+        from .backends import TreeEnsembleBackend
+        from sklearn.preprocessing import StandardScaler
+        arrays, meta = load_bundle(path, verify)
+        backend_class = get_backend(meta['model_type'])
+        if backend_class is TreeEnsembleBackend:
+            import pickle
+            backend = backend_class(pickle.loads(arrays['sklearn_model'].tobytes()), meta['threshold'])
+        else:
+            # TensorFlow потрібен лише Keras-бандлам; дерево відновлюється без нього
+            from tensorflow import keras
+            model = keras.models.model_from_json(meta['keras_config'])
+            model.set_weights([np.array(arrays[f'keras_{i}']) for i in range(meta['keras_weights'])])
+            backend = backend_class(backend_class.compile(model), meta['threshold'])
+        self._use_backend(backend)
+        self.scaler = StandardScaler()
+        self.scaler.mean_ = np.array(arrays['scaler_mean'])
+        self.scaler.scale_ = np.array(arrays['scaler_scale'])
+        self.scaler.var_ = np.array(arrays['scaler_var'])
+        self.scaler.n_samples_seen_ = np.int64(meta['scaler_samples'])
+        if meta.get('feature_order'):
+            self.scaler.feature_names_in_ = np.array(meta['feature_order'], dtype=object)
+        self.scaler.n_features_in_ = len(self.scaler.mean_)
+        self.input_dim = self.scaler.n_features_in_
+        print(f"✅ Бандл моделі завантажено (схема v{meta['schema_version']})")
+        return meta
+    
     def load_model(self, model_path='models/anomaly_detector.h5', scaler_path='models/preprocessor.pkl'):
-        self.model = keras.models.load_model(model_path)
+        info = {'model_type': 'classifier', 'threshold': 0.5}
+        info_path = self._backend_info_path(model_path)
+        if os.path.exists(info_path):
+            with open(info_path) as f:
+                info.update(json.load(f))
+        self._use_backend(get_backend(info['model_type']).load(model_path, info['threshold']))
         self.scaler = joblib.load(scaler_path)
-        print(f"✅ Модель завантажено")
\ No newline at end of file
+        print(f"✅ Модель завантажено")
+    
+    @staticmethod
+    def _backend_info_path(model_path):
+        return os.path.splitext(model_path)[0] + '_backend.json'
\ No newline at end of file
@@ -0,0 +1,105 @@
+import json
+import os
+import time
+import numpy as np
+from .tflite_inference import TFLiteDetector
+
+
+def _representative_dataset(X_calibration, n_samples=500, seed=42):
+    rng = np.random.default_rng(seed)
+    idx = rng.choice(len(X_calibration), size=min(n_samples, len(X_calibration)), replace=False)
+    samples = X_calibration[idx].astype(np.float32)
+
+    def generator():
+        for row in samples:
+            yield [row[None, :]]
+    return generator
+
+
+def quantize_int8(detector, X_calibration, n_calibration=500):
+    """Повна int8-квантизація (ваги та активації) моделі build_classifier_model через TFLite.
+
+    X_calibration - вибірка реального трафіку (немасштабовані ознаки); діапазони активацій
+    калібруються на ній. Вхід і вихід моделі теж int8, scaler лишається зовні.
+    """
+    import tensorflow as tf
+    X_scaled = detector.scaler.transform(X_calibration).astype(np.float32)
+    converter = tf.lite.TFLiteConverter.from_keras_model(detector.model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = _representative_dataset(X_scaled, n_calibration)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
+    return converter.convert()
+
+
+def convert_float(detector):
+    """Та сама модель у float32 TFLite - базова лінія для порівняння в одному рантаймі"""
+    import tensorflow as tf
+    return tf.lite.TFLiteConverter.from_keras_model(detector.model).convert()
+
+
+def _latency_us(predict, X, repeats=200):
+    row = X[:1]
+    predict(row)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        predict(row)
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def _quality(y_true, y_pred):
+    from sklearn.metrics import accuracy_score, recall_score, precision_score
+    return {
+        'accuracy': float(accuracy_score(y_true, y_pred)),
+        'precision': float(precision_score(y_true, y_pred, zero_division=0)),
+        'recall': float(recall_score(y_true, y_pred, zero_division=0))
+    }
+
+
+def quantization_report(detector, X_calibration, X_holdout, y_holdout, output_dir='models', n_calibration=500):
+    """Квантизує модель, зберігає артефакт і звіт: розмір, затримка, accuracy/recall проти float.
+
+    Розмір і затримка float-моделі міряються на float32 TFLite-версії того самого детектора,
+    тож speedup порівнює лише int8 і float в одному інтерпретаторі, без накладних витрат Keras.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    tflite_model = quantize_int8(detector, np.asarray(X_calibration, dtype=np.float32), n_calibration)
+    artifact_path = os.path.join(output_dir, 'anomaly_detector_int8.tflite')
+    with open(artifact_path, 'wb') as f:
+        f.write(tflite_model)
+    np.savez(os.path.join(output_dir, 'anomaly_detector_int8_scaler.npz'),
+             mean=detector.scaler.mean_, scale=detector.scaler.scale_)
+
+    int8 = TFLiteDetector(tflite_model, detector.scaler.mean_, detector.scaler.scale_)
+    X_holdout = np.asarray(X_holdout, dtype=np.float32)
+    y_holdout = np.asarray(y_holdout).ravel()
+    float_pred, _, _ = detector.detect_anomalies(X_holdout)
+    int8_pred, _, _ = int8.detect_anomalies(X_holdout)
+    float_quality = _quality(y_holdout, float_pred)
+    int8_quality = _quality(y_holdout, int8_pred)
+
+    float_model = convert_float(detector)
+    float_tflite = TFLiteDetector(float_model, detector.scaler.mean_, detector.scaler.scale_)
+    float_params_bytes = int(sum(w.nbytes for w in detector.model.get_weights()))
+    float_latency = _latency_us(float_tflite.predict, X_holdout)
+    int8_latency = _latency_us(int8.predict, X_holdout)
+
+    report = {
+        'artifact': artifact_path,
+        'size_bytes': {'float_weights': float_params_bytes, 'float_tflite': len(float_model),
+                       'int8_tflite': len(tflite_model)},
+        'size_reduction': len(float_model) / len(tflite_model),
+        'latency_us_per_flow': {'float': float_latency, 'int8': int8_latency},
+        'speedup': float_latency / int8_latency if int8_latency else None,
+        'float': float_quality,
+        'int8': int8_quality,
+        'delta': {k: int8_quality[k] - float_quality[k] for k in float_quality},
+        'holdout_size': int(len(y_holdout)),
+        'calibration_size': int(min(n_calibration, len(X_calibration)))
+    }
+    with open(os.path.join(output_dir, 'quantization_report.json'), 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ INT8 модель: {len(tflite_model) / 1024:.1f} КБ, recall {int8_quality['recall'] * 100:.2f}% "
+          f"(float {float_quality['recall'] * 100:.2f}%)")
+    return report
@@ -0,0 +1,45 @@
+import numpy as np
+
+
+class ReplayBuffer:
+    """Буфер фіксованого розміру з прикладами минулого трафіку (reservoir sampling).
+
+    Зберігає сирі (немасштабовані) ознаки, бо scaler оновлюється разом з моделлю.
+    Кожен побачений приклад має однакову ймовірність залишитися в буфері.
+    """
+
+    def __init__(self, capacity=10_000, input_dim=8, seed=42):
+        self.capacity = capacity
+        self.X = np.empty((capacity, input_dim), dtype=np.float32)
+        self.y = np.empty(capacity, dtype=np.float32)
+        self.size = 0
+        self.seen = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, X, y):
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y, dtype=np.float32).ravel()
+        # Спочатку заповнюємо вільні місця
+        free = min(self.capacity - self.size, len(X))
+        self.X[self.size:self.size + free] = X[:free]
+        self.y[self.size:self.size + free] = y[:free]
+        self.size += free
+        self.seen += free
+        X, y = X[free:], y[free:]
+        if len(X) == 0:
+            return
+        # Далі приклад з номером i замінює випадковий слот з ймовірністю capacity / (i + 1)
+        positions = self.rng.integers(0, self.seen + np.arange(1, len(X) + 1))
+        keep = positions < self.capacity
+        self.X[positions[keep]] = X[keep]
+        self.y[positions[keep]] = y[keep]
+        self.seen += len(X)
+
+    def sample(self, n):
+        if self.size == 0 or n <= 0:
+            return self.X[:0], self.y[:0]
+        idx = self.rng.integers(0, self.size, size=n)
+        return self.X[idx], self.y[idx]
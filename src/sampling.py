@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+from .data_loader import concat_chunks
+
+
+class ReservoirSampler:
+    """Рівномірна вибірка без повторень за один прохід по чанках.
+
+    Кожен рядок отримує випадковий ключ; зберігаються sample_size рядків з найменшими
+    ключами (еквівалент reservoir sampling), тому пам'ять ~ sample_size + один чанк.
+    """
+
+    def __init__(self, sample_size, seed=42):
+        self.sample_size = sample_size
+        self.rng = np.random.default_rng(seed)
+        self.offset = 0
+        self._keys = np.empty(0)
+        self._rows = None
+
+    def update(self, chunk):
+        keys = self.rng.random(len(chunk))
+        chunk = chunk.set_axis(np.arange(self.offset, self.offset + len(chunk)))
+        self.offset += len(chunk)
+        self._keys, self._rows = _keep_smallest(self._keys, self._rows, keys, chunk, self.sample_size)
+
+    def result(self):
+        if self._rows is None:
+            return pd.DataFrame()
+        # Порядок рядків як у файлі - результат не залежить від розміру чанку
+        return self._rows.sort_index()
+
+
+class StratifiedReservoirSampler:
+    """Стратифікована вибірка по колонці label з квотами на клас.
+
+    quotas: {label: n}. Якщо квоти не задані, sample_size ділиться порівну між класами,
+    а недобір з малих класів перерозподіляється на інші - рідкісні атаки зберігаються повністю.
+    """
+
+    def __init__(self, sample_size=None, quotas=None, label_column='label', seed=42):
+        if sample_size is None and quotas is None:
+            raise ValueError("Потрібно задати sample_size або quotas")
+        self.sample_size = sample_size
+        self.quotas = quotas
+        self.label_column = label_column
+        self.rng = np.random.default_rng(seed)
+        self.offset = 0
+        self.seen = {}
+        self._reservoirs = {}
+
+    def _capacity(self, label):
+        if self.quotas is not None:
+            return self.quotas.get(label, 0)
+        # Кількість класів заздалегідь невідома, тому кожен резервуар тримає до sample_size рядків
+        return self.sample_size
+
+    def update(self, chunk):
+        keys = self.rng.random(len(chunk))
+        chunk = chunk.set_axis(np.arange(self.offset, self.offset + len(chunk)))
+        self.offset += len(chunk)
+        labels = chunk[self.label_column].astype(str).to_numpy()
+        for label in np.unique(labels):
+            mask = labels == label
+            self.seen[label] = self.seen.get(label, 0) + int(mask.sum())
+            capacity = self._capacity(label)
+            if capacity <= 0:
+                continue
+            old_keys, old_rows = self._reservoirs.get(label, (np.empty(0), None))
+            self._reservoirs[label] = _keep_smallest(old_keys, old_rows, keys[mask], chunk[mask], capacity)
+
+    def allocation(self):
+        if self.quotas is not None:
+            return {label: min(self.quotas.get(label, 0), n) for label, n in self.seen.items()}
+        remaining = self.sample_size
+        allocation = {}
+        # Малі класи беруться повністю, залишок ділиться порівну між більшими
+        pending = sorted(self.seen.items(), key=lambda item: (item[1], item[0]))
+        while pending:
+            share = remaining // len(pending)
+            label, n = pending[0]
+            if n <= share:
+                allocation[label] = n
+                remaining -= n
+                pending.pop(0)
+                continue
+            for i, (label, n) in enumerate(pending):
+                allocation[label] = share + (1 if i < remaining - share * len(pending) else 0)
+            break
+        return allocation
+
+    def result(self):
+        parts = []
+        for label, n in sorted(self.allocation().items()):
+            if n <= 0 or label not in self._reservoirs:
+                continue
+            keys, rows = self._reservoirs[label]
+            parts.append(rows.iloc[np.argsort(keys, kind='stable')[:n]])
+        if not parts:
+            return pd.DataFrame()
+        return concat_frames(parts).sort_index()
+
+
+def _keep_smallest(keys, rows, new_keys, new_rows, k):
+    if rows is None:
+        all_keys, all_rows = new_keys, new_rows
+    else:
+        all_keys = np.concatenate([keys, new_keys])
+        all_rows = concat_frames([rows, new_rows])
+    if len(all_keys) > k:
+        keep = np.argpartition(all_keys, k - 1)[:k]
+        keep.sort()
+        all_keys, all_rows = all_keys[keep], all_rows.iloc[keep]
+    return all_keys, all_rows
+
+
+def concat_frames(frames):
+    # Як concat_chunks, але зберігає індекс (номер рядка у файлі)
+    index = np.concatenate([frame.index.to_numpy() for frame in frames])
+    return concat_chunks(frames).set_axis(index)
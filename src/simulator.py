@@ -2,6 +2,10 @@ import numpy as np
 import pandas as pd
 from datetime import datetime
 
+FEATURE_COLUMNS = ['dur', 'spkts', 'dpkts', 'sbytes', 'dbytes', 'rate', 'sttl', 'dttl']
+INTEGER_COLUMNS = ['spkts', 'dpkts', 'sbytes', 'dbytes', 'sttl', 'dttl']
+TRAFFIC_LABELS = {'normal': 'Benign', 'ddos': 'DDoS', 'port_scan': 'PortScan', 'mirai': 'Mirai'}
+
 class IoTTrafficSimulator:
     def __init__(self):
         self.device_types = ['Smart Camera', 'Smart Thermostat', 'Smart Lock', 'Smart Speaker', 'Smart Light']
@@ -17,6 +21,71 @@ class IoTTrafficSimulator:
             'Smart Light': {'dur': (0.1, 0.5), 'spkts': (1, 5), 'dpkts': (1, 3), 'sbytes': (20, 100),
                           'dbytes': (20, 80), 'rate': (2, 10), 'sttl': (64, 128), 'dttl': (64, 128)}
         }
+        # Профілі атак не залежать від типу пристрою (ті самі діапазони, що й у generate_* нижче)
+        self.attack_profiles = {
+            'ddos': {'dur': (0.01, 0.1), 'spkts': (100, 500), 'dpkts': (5, 20), 'sbytes': (5000, 20000),
+                     'dbytes': (50, 200), 'rate': (500, 2000), 'sttl': (32, 64), 'dttl': (32, 64)},
+            'port_scan': {'dur': (0.01, 0.05), 'spkts': (1, 3), 'dpkts': (0, 2), 'sbytes': (20, 100),
+                          'dbytes': (0, 50), 'rate': (200, 500), 'sttl': (64, 128), 'dttl': (64, 128)},
+            'mirai': {'dur': (0.5, 2.0), 'spkts': (50, 200), 'dpkts': (40, 180), 'sbytes': (2000, 10000),
+                      'dbytes': (1500, 8000), 'rate': (100, 400), 'sttl': (48, 64), 'dttl': (48, 64)}
+        }
+        self.traffic_types = list(TRAFFIC_LABELS)
+
+    def get_profile(self, device_type, traffic_type='normal'):
+        if traffic_type == 'normal':
+            return self.normal_profiles[device_type]
+        if traffic_type not in self.attack_profiles:
+            raise ValueError(f"Невідомий тип трафіку: {traffic_type}")
+        return self.attack_profiles[traffic_type]
+
+    def generate_batch(self, device_type, traffic_type='normal', n_packets=1, rng=None, timestamp=None):
+        # Векторизована генерація: усі 8 ознак для N пакетів одним викликом uniform.
+        # rng - np.random.Generator; за замовчуванням глобальний стан np.random
+        profile = self.get_profile(device_type, traffic_type)
+        low = np.array([profile[c][0] for c in FEATURE_COLUMNS], dtype=np.float64)
+        high = np.array([profile[c][1] for c in FEATURE_COLUMNS], dtype=np.float64)
+        rng = np.random if rng is None else rng
+        values = rng.uniform(low, high, size=(n_packets, len(FEATURE_COLUMNS)))
+        devices = np.full(n_packets, self.device_types.index(device_type))
+        labels = np.full(n_packets, self.traffic_types.index(traffic_type))
+        return self._to_frame(values, devices, labels, timestamp)
+
+    def generate_mixed_batch(self, device_codes, traffic_codes, rng=None, timestamp=None):
+        # Батч зі змішаними пристроями і типами трафіку: коди - індекси в device_types / traffic_types
+        device_codes = np.asarray(device_codes)
+        traffic_codes = np.asarray(traffic_codes)
+        low, high = self._bounds_table()
+        rng = np.random if rng is None else rng
+        values = rng.uniform(low[traffic_codes, device_codes], high[traffic_codes, device_codes])
+        return self._to_frame(values, device_codes, traffic_codes, timestamp)
+
+    def _bounds_table(self):
+        # Межі uniform для кожної пари (тип трафіку, пристрій): форма (типи, пристрої, ознаки)
+        shape = (len(self.traffic_types), len(self.device_types), len(FEATURE_COLUMNS))
+        low, high = np.empty(shape), np.empty(shape)
+        for t, traffic_type in enumerate(self.traffic_types):
+            for d, device_type in enumerate(self.device_types):
+                profile = self.get_profile(device_type, traffic_type)
+                low[t, d] = [profile[c][0] for c in FEATURE_COLUMNS]
+                high[t, d] = [profile[c][1] for c in FEATURE_COLUMNS]
+        return low, high
+
+    def _to_frame(self, values, device_codes, label_codes, timestamp=None):
+        n_packets = len(values)
+        if timestamp is None:
+            timestamp = datetime.now()
+        if np.ndim(timestamp) == 0:
+            timestamp = np.full(n_packets, np.datetime64(timestamp, 'us'))
+        columns = {
+            'timestamp': timestamp,
+            'device': pd.Categorical.from_codes(device_codes, categories=self.device_types)
+        }
+        for j, col in enumerate(FEATURE_COLUMNS):
+            # astype(int64) відкидає дробову частину так само, як int() у поштучних генераторах
+            columns[col] = values[:, j].astype(np.int64) if col in INTEGER_COLUMNS else values[:, j]
+        columns['label'] = pd.Categorical.from_codes(label_codes, categories=list(TRAFFIC_LABELS.values()))
+        return pd.DataFrame(columns)
     
     def generate_normal_traffic(self, device_type, n_packets=1):
         profile = self.normal_profiles[device_type]
@@ -0,0 +1,228 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .data_loader import IoTDataLoader, NUMERIC_FEATURES
+
+DEFAULT_QUANTILES = (0.01, 0.25, 0.5, 0.75, 0.99)
+
+
+class QuantileSketch:
+    """Об'єднуваний скетч квантилів з відносною точністю (логарифмічні біни, як у DDSketch).
+
+    Значення x > 0 потрапляє в бін ceil(log_gamma(x)); оцінка квантиля відрізняється від
+    точної не більше ніж на relative_accuracy. Два скетчі з однаковою точністю об'єднуються
+    додаванням лічильників, тому статистику можна рахувати паралельно по шардах.
+    Скетч також тримає точні min/max, і оцінки обрізаються до них (центр біна може
+    виходити за спостережений діапазон, наприклад p01 = 0.99 при min = 1).
+    """
+
+    def __init__(self, relative_accuracy=0.01, min_value=1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _add_bins(self, store, values):
+        keys = np.ceil(np.log(values) / self.log_gamma).astype(np.int64)
+        for key, n in zip(*np.unique(keys, return_counts=True)):
+            store[int(key)] = store.get(int(key), 0) + int(n)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        positive = values[values > self.min_value]
+        negative = -values[values < -self.min_value]
+        if len(positive):
+            self._add_bins(self.positive, positive)
+        if len(negative):
+            self._add_bins(self.negative, negative)
+        self.zero_count += len(values) - len(positive) - len(negative)
+        self.count += len(values)
+        if len(values):
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Скетчі з різною точністю не об'єднуються")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, n in other_store.items():
+                store[key] = store.get(key, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+        return min(max(self._estimate(q), self.min), self.max)
+
+    def _estimate(self, q):
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
+
+
+class FeatureMoments:
+    """Кількість, середнє, дисперсія (Welford/Chan), min/max і скетч квантилів однієї ознаки"""
+
+    def __init__(self, relative_accuracy=0.01):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        other = FeatureMoments(self.sketch.relative_accuracy)
+        other.count = len(values)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        other.sketch.update(values)
+        self.merge(other)
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def result(self, quantiles=DEFAULT_QUANTILES):
+        if self.count == 0:
+            return None
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'variance': self.m2 / (self.count - 1) if self.count > 1 else 0.0,
+            'min': self.min,
+            'max': self.max,
+            'quantiles': {q: self.sketch.quantile(q) for q in quantiles}
+        }
+
+
+class StreamingStats:
+    """Статистика датасету за один прохід по чанках; результати шардів об'єднуються через merge()"""
+
+    def __init__(self, features=NUMERIC_FEATURES, label_column='label', relative_accuracy=0.01):
+        self.features = list(features)
+        self.label_column = label_column
+        self.total_records = 0
+        self.columns = []
+        self.missing_values = {}
+        self.label_distribution = {}
+        self.feature_stats = {f: FeatureMoments(relative_accuracy) for f in self.features}
+
+    def update(self, chunk):
+        self.total_records += len(chunk)
+        for col, n in chunk.isnull().sum().items():
+            if col not in self.missing_values:
+                self.columns.append(col)
+                self.missing_values[col] = 0
+            self.missing_values[col] += int(n)
+        if self.label_column in chunk.columns:
+            for label, n in chunk[self.label_column].value_counts().items():
+                self.label_distribution[label] = self.label_distribution.get(label, 0) + int(n)
+        for f in self.features:
+            if f in chunk.columns:
+                self.feature_stats[f].update(chunk[f].to_numpy())
+        return self
+
+    def merge(self, other):
+        self.total_records += other.total_records
+        for col in other.columns:
+            if col not in self.missing_values:
+                self.columns.append(col)
+                self.missing_values[col] = 0
+            self.missing_values[col] += other.missing_values[col]
+        for label, n in other.label_distribution.items():
+            self.label_distribution[label] = self.label_distribution.get(label, 0) + n
+        for f in self.features:
+            self.feature_stats[f].merge(other.feature_stats[f])
+        return self
+
+    def result(self, quantiles=DEFAULT_QUANTILES):
+        label_distribution = {k: v for k, v in self.label_distribution.items() if v}
+        return {
+            'total_records': self.total_records,
+            'features': list(self.columns),
+            'missing_values': dict(self.missing_values),
+            'label_distribution': label_distribution if self.label_column in self.columns else None,
+            'feature_stats': {f: s.result(quantiles) for f, s in self.feature_stats.items() if s.count}
+        }
+
+
+def compute_file_stats(path, chunksize=500_000):
+    stats = StreamingStats()
+    for chunk in IoTDataLoader(path, chunksize=chunksize).iter_chunks(compact=False):
+        stats.update(chunk)
+    return stats
+
+
+def _safe_file_stats(path, chunksize):
+    try:
+        return path, compute_file_stats(path, chunksize), None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def compute_stats(paths, n_workers=None, chunksize=500_000, errors=None):
+    """Статистика по кількох файлах-шардах паралельно, з об'єднанням скетчів.
+
+    Файл, що не парситься, пропускається, а помилка записується в errors (path -> текст);
+    ValueError - лише якщо не вдалося прочитати жоден файл.
+    """
+    paths = [paths] if isinstance(paths, (str, os.PathLike)) else list(paths)
+    n_workers = min(n_workers or os.cpu_count() or 1, len(paths))
+    if n_workers <= 1:
+        results = [_safe_file_stats(p, chunksize) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(_safe_file_stats, paths, [chunksize] * len(paths)))
+    errors = {} if errors is None else errors
+    total = StreamingStats()
+    for path, part, error in results:
+        if error:
+            errors[path] = error
+            print(f"⚠️ {path}: {error}")
+        else:
+            total.merge(part)
+    if paths and len(errors) == len(paths):
+        raise ValueError(f"Жоден файл не прочитано: {errors}")
+    return total
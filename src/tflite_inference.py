@@ -0,0 +1,59 @@
+import numpy as np
+
+
+def _interpreter_class():
+    # На шлюзі достатньо tflite-runtime; повний TensorFlow - лише запасний варіант
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteDetector:
+    """Інференс TFLite-моделі (int8 або float) з тим самим контрактом, що й detect_anomalies.
+    Модуль не імпортує TensorFlow: на шлюзі достатньо пакета tflite-runtime"""
+
+    def __init__(self, model_content, scaler_mean, scaler_scale, threshold=0.5):
+        self.interpreter = _interpreter_class()(model_content=model_content)
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        self.mean = np.asarray(scaler_mean, dtype=np.float32)
+        self.scale = np.asarray(scaler_scale, dtype=np.float32)
+        self.threshold = threshold
+
+    @classmethod
+    def load(cls, model_path, scaler_path, threshold=0.5):
+        # Артефакти quantization_report: .tflite і .npz з параметрами scaler
+        with open(model_path, 'rb') as f:
+            model_content = f.read()
+        scaler = np.load(scaler_path)
+        return cls(model_content, scaler['mean'], scaler['scale'], threshold)
+
+    def predict(self, X):
+        X = (np.asarray(X, dtype=np.float32) - self.mean) / self.scale
+        quantized = self.input['dtype'] == np.int8
+        if quantized:
+            in_scale, in_zero = self.input['quantization']
+            X = np.clip(np.round(X / in_scale + in_zero), -128, 127).astype(np.int8)
+        # Інтерпретатор має фіксований розмір батчу, тому ресайзимо під вхід
+        if self.input['shape'][0] != len(X):
+            self.interpreter.resize_tensor_input(self.input['index'], X.shape)
+            self.interpreter.allocate_tensors()
+            self.input = self.interpreter.get_input_details()[0]
+            self.output = self.interpreter.get_output_details()[0]
+        self.interpreter.set_tensor(self.input['index'], X)
+        self.interpreter.invoke()
+        y = self.interpreter.get_tensor(self.output['index']).astype(np.float32)
+        if self.output['dtype'] == np.int8:
+            out_scale, out_zero = self.output['quantization']
+            y = (y - out_zero) * out_scale
+        return y.flatten()
+
+    def detect_anomalies(self, X, threshold=None):
+        anomaly_scores = self.predict(X)
+        if threshold is None:
+            threshold = self.threshold
+        return anomaly_scores > threshold, anomaly_scores, threshold
@@ -0,0 +1,81 @@
+import time
+from datetime import datetime
+import numpy as np
+from .simulator import IoTTrafficSimulator
+
+# Рівномірний вибір атаки, як у Live Demo: np.random.choice(['ddos', 'port_scan', 'mirai'])
+DEFAULT_ATTACK_MIX = {'ddos': 1.0, 'port_scan': 1.0, 'mirai': 1.0}
+
+
+class TrafficStream:
+    """Нескінченне джерело трафіку: батчі фіксованого розміру з цільовою швидкістю flows/s.
+
+    Час пакетів береться з симульованого монотонного годинника (batch_size / flows_per_second
+    секунд на батч), а не з datetime.now(). При realtime=False батчі видаються без затримок,
+    що дозволяє перевіряти детектори на максимальній швидкості.
+    """
+
+    def __init__(self, simulator=None, batch_size=1000, flows_per_second=10_000, attack_prob=0.4,
+                 attack_mix=None, seed=None, start_time=None, realtime=True):
+        if batch_size < 1 or flows_per_second <= 0:
+            raise ValueError("batch_size та flows_per_second мають бути додатними")
+        self.simulator = simulator or IoTTrafficSimulator()
+        self.batch_size = batch_size
+        self.flows_per_second = flows_per_second
+        self.attack_prob = attack_prob
+        self.realtime = realtime
+        self.start_time = np.datetime64(start_time or datetime.now(), 'us')
+        self.rng = np.random.default_rng(seed)
+
+        attack_mix = DEFAULT_ATTACK_MIX if attack_mix is None else attack_mix
+        weights = np.array(list(attack_mix.values()), dtype=np.float64)
+        self.attack_codes = np.array([self.simulator.traffic_types.index(t) for t in attack_mix])
+        self.attack_weights = weights / weights.sum()
+        self.normal_code = self.simulator.traffic_types.index('normal')
+
+        self.clock = 0.0  # симульований час від start_time, секунди
+        self.flows_emitted = 0
+        self._wall_start = None
+
+    def next_batch(self):
+        n = self.batch_size
+        rng = self.rng
+        devices = rng.integers(0, len(self.simulator.device_types), size=n)
+        attacks = rng.choice(self.attack_codes, size=n, p=self.attack_weights)
+        traffic = np.where(rng.random(n) < self.attack_prob, attacks, self.normal_code)
+
+        offsets_us = ((self.clock + np.arange(n) / self.flows_per_second) * 1e6).astype(np.int64)
+        timestamps = self.start_time + offsets_us.astype('timedelta64[us]')
+        self.clock += n / self.flows_per_second
+        self.flows_emitted += n
+        return self.simulator.generate_mixed_batch(devices, traffic, rng=rng, timestamp=timestamps)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._wall_start is None:
+            self._wall_start = time.monotonic()
+        if self.realtime:
+            # Батч k видається в момент start + k * batch_size / flows_per_second
+            delay = self._wall_start + self.clock - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return self.next_batch()
+
+    @property
+    def lag(self):
+        # Наскільки споживач відстає від цільової швидкості (секунди); > 0 означає насичення
+        if self._wall_start is None:
+            return 0.0
+        return max(0.0, time.monotonic() - self._wall_start - self.clock)
+
+    def stats(self):
+        wall = time.monotonic() - self._wall_start if self._wall_start is not None else 0.0
+        return {
+            'flows_emitted': self.flows_emitted,
+            'simulated_seconds': self.clock,
+            'wall_seconds': wall,
+            'achieved_flows_per_second': self.flows_emitted / wall if wall > 0 else 0.0,
+            'lag_seconds': self.lag
+        }
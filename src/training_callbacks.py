@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import time
+import joblib
+import numpy as np
+from tensorflow import keras
+
+CHECKPOINT_MODEL = 'checkpoint.keras'
+CHECKPOINT_SCALER = 'checkpoint_scaler.pkl'
+CHECKPOINT_STATE = 'checkpoint_state.json'
+CHECKPOINT_BEST_WEIGHTS = 'checkpoint_best_weights.npz'
+
+
+def fingerprint(*arrays):
+    """Хеш вмісту масивів (форма, тип, байти) - щоб не продовжити навчання на інших даних"""
+    h = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        h.update(f"{array.dtype.str}{array.shape}".encode())
+        h.update(array.data)
+    return h.hexdigest()
+
+
+class TimeBudget(keras.callbacks.Callback):
+    """Зупиняє навчання, якщо наступна епоха не вкладеться в max_seconds"""
+
+    def __init__(self, max_seconds):
+        super().__init__()
+        self.max_seconds = max_seconds
+        self.start = None
+        self.epochs_run = 0
+        self.stopped_epoch = None
+
+    def on_train_begin(self, logs=None):
+        self.start = time.monotonic()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.epochs_run += 1
+        elapsed = time.monotonic() - self.start
+        per_epoch = elapsed / self.epochs_run
+        if elapsed + per_epoch > self.max_seconds:
+            self.stopped_epoch = epoch
+            self.model.stop_training = True
+            print(f"\n⏱️ Бюджет часу {self.max_seconds:.0f}с вичерпано після епохи {epoch + 1}")
+
+
+class ResumableEarlyStopping(keras.callbacks.EarlyStopping):
+    """EarlyStopping, чий стан (best, wait, найкращі ваги) переживає перерване навчання"""
+
+    def __init__(self, state=None, best_weights=None, **kwargs):
+        super().__init__(**kwargs)
+        self.initial_state = state
+        self.initial_best_weights = best_weights
+
+    def on_train_begin(self, logs=None):
+        super().on_train_begin(logs)
+        if self.initial_state:
+            self.best = self.initial_state['best']
+            self.wait = self.initial_state['wait']
+            self.best_epoch = self.initial_state['best_epoch']
+            self.best_weights = self.initial_best_weights
+
+    def get_state(self):
+        return {'best': None if self.best is None else float(self.best), 'wait': int(self.wait),
+                'best_epoch': int(self.best_epoch)}
+
+
+class TrainingCheckpoint(keras.callbacks.Callback):
+    """Періодично зберігає ваги, стан оптимізатора, scaler, історію, стан early stopping
+    і відбитки даних/scaler для відновлення навчання"""
+
+    def __init__(self, checkpoint_dir, scaler, every=1, history=None, early_stopping=None, fingerprints=None):
+        super().__init__()
+        self.checkpoint_dir = checkpoint_dir
+        self.scaler = scaler
+        self.every = every
+        self.history = history or {}
+        self.early_stopping = early_stopping
+        self.fingerprints = fingerprints or {}
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    def on_epoch_end(self, epoch, logs=None):
+        for key, value in (logs or {}).items():
+            self.history.setdefault(key, []).append(float(value))
+        if (epoch + 1) % self.every == 0:
+            self.save(epoch + 1)
+
+    def save(self, epoch, completed=False):
+        model_path = os.path.join(self.checkpoint_dir, CHECKPOINT_MODEL)
+        # Спочатку пишемо у тимчасовий файл: перерваний запис не зіпсує попередній checkpoint
+        self.model.save(model_path + '.tmp.keras')
+        os.replace(model_path + '.tmp.keras', model_path)
+        joblib.dump(self.scaler, os.path.join(self.checkpoint_dir, CHECKPOINT_SCALER))
+        state = dict(self.fingerprints, epoch=epoch, completed=completed, history=self.history)
+        if self.early_stopping is not None:
+            state['early_stopping'] = self.early_stopping.get_state()
+            if self.early_stopping.best_weights is not None:
+                weights_path = os.path.join(self.checkpoint_dir, CHECKPOINT_BEST_WEIGHTS)
+                with open(weights_path + '.tmp', 'wb') as f:
+                    np.savez(f, *self.early_stopping.best_weights)
+                os.replace(weights_path + '.tmp', weights_path)
+        state_path = os.path.join(self.checkpoint_dir, CHECKPOINT_STATE)
+        with open(state_path + '.tmp', 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(state_path + '.tmp', state_path)
+
+
+def load_checkpoint(checkpoint_dir):
+    """Повертає (model, scaler, state) останнього незавершеного навчання або None;
+    найкращі ваги early stopping (якщо збережені) - у state['best_weights']"""
+    state_path = os.path.join(checkpoint_dir, CHECKPOINT_STATE)
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path) as f:
+        state = json.load(f)
+    if state.get('completed'):
+        return None
+    model = keras.models.load_model(os.path.join(checkpoint_dir, CHECKPOINT_MODEL))
+    scaler = joblib.load(os.path.join(checkpoint_dir, CHECKPOINT_SCALER))
+    weights_path = os.path.join(checkpoint_dir, CHECKPOINT_BEST_WEIGHTS)
+    if os.path.exists(weights_path):
+        with np.load(weights_path) as weights:
+            state['best_weights'] = [weights[f'arr_{i}'] for i in range(len(weights.files))]
+    return model, scaler, state
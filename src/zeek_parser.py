@@ -0,0 +1,151 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# Ознаки моделі -> поля Zeek conn.log
+ZEEK_FIELD_MAP = {
+    'dur': 'duration',
+    'spkts': 'orig_pkts',
+    'dpkts': 'resp_pkts',
+    'sbytes': 'orig_bytes',
+    'dbytes': 'resp_bytes'
+}
+ZEEK_DTYPES = {'dur': 'float32', 'rate': 'float32', 'spkts': 'int32', 'dpkts': 'int32',
+               'sbytes': 'int64', 'dbytes': 'int64', 'sttl': 'uint8', 'dttl': 'uint8'}
+OUTPUT_COLUMNS = ['dur', 'spkts', 'dpkts', 'sbytes', 'dbytes', 'rate', 'sttl', 'dttl', 'label', 'device']
+# У conn.log немає TTL, тому sttl/dttl заповнюються типовим значенням
+DEFAULT_TTL = 64
+
+
+def is_zeek_log(path):
+    name = os.path.basename(str(path))
+    return name.endswith('.labeled') or name.endswith('.log') or 'conn.log' in name
+
+
+def read_zeek_header(path):
+    """Повертає (колонки_через_tab, назви_полів). В IoT-23 останні поля
+    'tunnel_parents   label   detailed-label' розділені пробілами, а не табами"""
+    with open(path, 'r', errors='replace') as f:
+        for line in f:
+            if not line.startswith('#'):
+                break
+            if line.startswith('#fields'):
+                columns = line.rstrip('\n').split('\t')[1:]
+                return columns, [name for column in columns for name in column.split()]
+    raise ValueError(f"У файлі {path} немає заголовка #fields")
+
+
+def _label_columns(columns):
+    # Колонки з label / detailed-label (окремі або упаковані в одну через пробіли)
+    return [c for c in columns if {'label', 'detailed-label'} & set(c.split())]
+
+
+def read_conn_header(path):
+    """read_zeek_header з перевіркою, що це conn.log: інші логи Zeek (dns.log, http.log...)
+    не мають полів потоку, і замість нульових ознак краще одразу відмовити"""
+    columns, names = read_zeek_header(path)
+    missing = [field for field in ZEEK_FIELD_MAP.values() if field not in names]
+    if missing:
+        raise ValueError(f"{path} не схожий на Zeek conn.log: немає полів {missing}")
+    return columns, names
+
+
+def zeek_output_columns(path):
+    # Колонки, які дасть iter_zeek_chunks для цього файлу: label - лише якщо є поля міток
+    columns, _ = read_conn_header(path)
+    return [c for c in OUTPUT_COLUMNS if c != 'label' or _label_columns(columns)]
+
+
+def normalize_label(label, detailed_label=None):
+    # Мітки IoT-23 -> класи симулятора; інші шкідливі мітки лишаються як є (детальні)
+    text = f"{label or ''} {detailed_label or ''}".lower()
+    if 'malicious' not in text:
+        return 'Benign'
+    if 'ddos' in text:
+        return 'DDoS'
+    if 'portscan' in text:
+        return 'PortScan'
+    if 'mirai' in text or 'okiru' in text:
+        return 'Mirai'
+    if detailed_label and detailed_label != '-':
+        return detailed_label
+    return 'Malicious'
+
+
+def iter_zeek_chunks(path, chunksize=500_000, default_ttl=DEFAULT_TTL):
+    """Потоковий парсер conn.log.labeled: чанки з 8 ознаками, label і device"""
+    columns, _ = read_conn_header(path)
+    label_columns = _label_columns(columns)
+    needed = set(ZEEK_FIELD_MAP.values()) | {'id.orig_h'}
+    usecols = [c for c in columns if c in needed or c in label_columns]
+
+    # Числові поля парсить C-рушій pandas одразу у float64; '-' стає NaN
+    dtype = {c: ('float64' if c in ZEEK_FIELD_MAP.values() else str) for c in usecols}
+    reader = pd.read_csv(path, sep='\t', comment='#', header=None, names=columns, usecols=usecols,
+                         na_values=['-', '(empty)'], keep_default_na=False, dtype=dtype,
+                         chunksize=chunksize, engine='c')
+    with reader:
+        for chunk in reader:
+            yield _convert_chunk(chunk, label_columns, default_ttl)
+
+
+def _convert_chunk(chunk, label_columns, default_ttl):
+    n = len(chunk)
+    out = {}
+    for feature, field in ZEEK_FIELD_MAP.items():
+        # Поле є завжди (read_conn_header); '-' у рядку означає відсутнє значення -> 0
+        out[feature] = chunk[field].fillna(0).to_numpy(np.float64)
+    # rate як у UNSW-NB15: пакети за секунду
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out['rate'] = np.where(out['dur'] > 0, (out['spkts'] + out['dpkts']) / out['dur'], 0.0)
+    out['sttl'] = np.full(n, default_ttl)
+    out['dttl'] = np.full(n, default_ttl)
+    df = pd.DataFrame({c: out[c].astype(ZEEK_DTYPES[c]) for c in ZEEK_DTYPES})[OUTPUT_COLUMNS[:8]]
+
+    if label_columns:
+        raw = chunk[label_columns[0]].fillna('-')
+        for column in label_columns[1:]:
+            raw = raw + ' ' + chunk[column].fillna('-')
+        names = [name for column in label_columns for name in column.split()]
+        # Нормалізуємо лише унікальні значення - їх у файлі одиниці
+        mapping = {}
+        for value in raw.unique():
+            fields = dict(zip(names, value.split()))
+            mapping[value] = normalize_label(fields.get('label'), fields.get('detailed-label'))
+        df['label'] = pd.Categorical(raw.map(mapping))
+    device = chunk['id.orig_h'].fillna('unknown') if 'id.orig_h' in chunk else pd.Series(['unknown'] * n)
+    df['device'] = pd.Categorical(device)
+    return df
+
+
+def load_zeek_log(path, chunksize=500_000, default_ttl=DEFAULT_TTL):
+    from .data_loader import concat_chunks
+    return concat_chunks(list(iter_zeek_chunks(path, chunksize, default_ttl)))
+
+
+def benchmark(path, chunksize=500_000, repeats=1):
+    """Пропускна здатність парсера в МБ/с і рядках/с"""
+    size = os.path.getsize(path)
+    best = None
+    rows = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        rows = sum(len(chunk) for chunk in iter_zeek_chunks(path, chunksize))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        'file_mb': size / 1e6,
+        'rows': rows,
+        'seconds': best,
+        'mb_per_second': size / 1e6 / best if best else 0.0,
+        'rows_per_second': rows / best if best else 0.0
+    }
+
+
+if __name__ == '__main__':
+    for log_path in sys.argv[1:]:
+        result = benchmark(log_path, repeats=3)
+        print(f"📊 {log_path}: {result['rows']:,} рядків, {result['mb_per_second']:.1f} МБ/с, "
+              f"{result['rows_per_second']:,.0f} рядків/с")